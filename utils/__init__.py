@@ -1,2 +1,14 @@
+from . import isa
 from . import processor
-from . import assembler
\ No newline at end of file
+from . import assembler
+from . import optimizer
+from . import multicore
+from . import debugger
+from . import cache
+from . import ports
+from . import timetravel
+from . import shared
+from . import verifier
+from . import paged
+from . import fuzzing
+from . import checkpoint
\ No newline at end of file
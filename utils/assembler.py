@@ -1,6 +1,9 @@
 import re
 from typing import Literal
 
+from . import isa
+from .optimizer import AssemblerOptimizer
+
 class AssemblerConversion():
     """Класс для реализации конверсии из программы на самоопределённом языке ассемблера в программу на машинном коде
 
@@ -54,6 +57,38 @@ class AssemblerConversion():
             `lama: mov r0 d3` - метка `lama`, которая ведёт на команду `mov r0 d3`
 
             `vampire: cmp r3 r0` - метка `vampire`, которая ведёт на команду `cmp r3 r0`
+
+            `finish:` - метка без команды в конце программы: прыжок на неё завершает программу
+    - `coreid`: запись в регистр номера ядра, которое выполняет команду (см. `MultiCoreImitation`, у одиночного ядра номер 0).
+            Примеры:
+            - `coreid r1` - запись номера ядра в регистр с адресом 1
+    - `xadd`: атомарное сложение с памятью данных по адресу из регистра. В регистр записывается старое значение из памяти.
+            Примеры:
+            - `xadd r2 [r0]` - DMEM[r0] = DMEM[r0] + r2, а в r2 записывается прежнее значение DMEM[r0]
+    - `xchg` с памятью: атомарный обмен значений регистра и памяти данных по адресу из регистра. Может использоваться как запись по адресу из регистра.
+            Примеры:
+            - `xchg r2 [r0]` - содержимое регистра с адресом 2 и памяти данных по адресу из регистра r0 меняются местами
+    - `barrier`: барьер, ядро ждёт, пока все работающие ядра не дойдут до барьера. Для одного ядра ничего не делает.
+            Примеры:
+            - `barrier`
+    - `in`, `out`: ввод из порта и вывод в порт (см. `utils.ports`). Порты обозначаются как `p<номер>`.
+            После `in` флаг `ZF` = 1, если поток закончился (в регистр при этом записывается 0), иначе `ZF` = 0.
+            Примеры:
+            - `in r1 p0` - чтение следующего значения из порта 0 в регистр с адресом 1
+            - `out p1 r2` - запись значения из регистра с адресом 2 в порт 1
+    - `loop`: цикл, из регистра вычитается 1, и если результат не равен нулю, выполняется прыжок на метку. Флаги не меняются.
+            Примеры:
+            - `loop r2 point_start` - r2 = r2 - 1, прыжок в метку `point_start` при r2 != 0
+    - `max`, `min`: выбор большего (меньшего) значения в регистр. Флаги не меняются.
+            Примеры:
+            - `max r0 r1` - r0 = max(r0, r1)
+            - `min r0 [r1]` - r0 = min(r0, значение из памяти данных по адресу из регистра r1)
+    - Блочные команды над диапазоном памяти данных: начальный адрес берётся из регистра в квадратных скобках, количество ячеек - из последнего регистра
+            (при количестве <= 0 команда ничего не делает):
+            - `fill [r1] r2 r3` - запись значения r2 в r3 ячеек, начиная с адреса из r1
+            - `copy [r1] [r2] r3` - копирование r3 ячеек с адреса из r2 на адрес из r1 (диапазоны могут пересекаться)
+            - `sum r0 [r1] r3` - прибавление к r0 суммы r3 ячеек, начиная с адреса из r1
+            - `max r0 [r1] r3`, `min r0 [r1] r3` - r0 = наибольшее (наименьшее) из r0 и r3 ячеек, начиная с адреса из r1
     
     Attributes
     ----------
@@ -61,17 +96,23 @@ class AssemblerConversion():
         Тип комады, которая обрабатывается в данный момент
     
     `type_of_memory_dest` : str = None
-        Данные какого типа (`r` для регистров, `d` для данных) будут использоваться в качестве первого операнда
+        Данные какого типа (`r` для регистров, `d` для данных, `p` для портов) будут использоваться в качестве первого операнда
 
     `memory_number_dest` : int
         Адрес данных первого операнда
     
     `type_of_memory_in` : str
-        Данные какого типа (`r` для регистров, `d` для данных) будут использоваться в качестве второго операнда
+        Данные какого типа (`r` для регистров, `d` для данных, `p` для портов) будут использоваться в качестве второго операнда
 
     `memory_number_in` : int
         Адрес данных второго операнда
 
+    `type_of_memory_extra` : str
+        Данные какого типа будут использоваться в качестве третьего операнда (у блочных команд)
+
+    `memory_number_extra` : int
+        Адрес данных третьего операнда
+
     `literal` : int
         Дополнительное значение literal для чисел
 
@@ -89,16 +130,22 @@ class AssemblerConversion():
 
     `jump_pc` : dictionary
         Словарь для меток и команд прыжков, какая метка соответствует какому прыжку
+
+    `jump_operands` : dictionary
+        Словарь для команд прыжков с операндами перед меткой (например, `loop r2 point_start`): виды и значения этих операндов
     
     `some_massive` : list
         Дополнительная переменная для обработки команды set, куда записывается программа на ассемблере для установки памяти данных
 
     `converse_list` : list
         Переменная, где в результате обработки команд будет хранится программа, список из машинных кодов для `ProcessorImitation`
+
+    `optimization_report` : dict = None
+        Отчёт `AssemblerOptimizer` о последней оптимизации (при `optimize` = True), в т.ч. количество сэкономленных команд `saved`
     
     Methods
     -------
-    `converse_all`(cmd : list[str], debug_print : bool = False) -> list[int]
+    `converse_all`(cmd : list[str], debug_print : bool = False, optimize : bool = False) -> list[int]
         Метод для перевода программы на самоопределённом языке ассемблера в программу на машинном коде
     
     `converse`(cmd : str, debug_print : bool = False) -> int
@@ -107,7 +154,7 @@ class AssemblerConversion():
     `fill_jumps`( : ) -> None
         Метод для заполнения команд прыжков
     
-    `make_jump`(type_of_jump : Literal["js", "jns", "je" "jne"]) -> int
+    `make_jump`(type_of_jump : Literal["js", "jns", "je" "jne", "loop"], kinds : tuple = (), values : list = ()) -> int
         Создание команды на машинном коде для команды прыжка
     
     `split_command`(cmd : str) -> list[str]
@@ -122,17 +169,14 @@ class AssemblerConversion():
     `set_data`( : ) -> list[str]
         Специальный метод для обработки команды `set`
 
-    `number_10_to_16`(num : int, literal : bool = False) -> int
-        Метод для перевода десятичного значения в шестнадцатеричное
+    `operand_kinds`( : ) -> tuple[str, ...]
+        Метод для определения видов операндов обрабатываемой команды
 
-    `standart_literal`( : ) -> (int, int)
-        Команда для создания переменных команды operand_2 и literal в случае использования literal
-    
-    `standart_operand`( : ) -> (int, int)
-        Команда для создания переменных команды operand_2 и literal в случае использования operand_2
+    `operand_values`( : ) -> list[int]
+        Метод для получения значений операндов обрабатываемой команды
     
     `to_command`( : ) -> int
-        Метод для перевода команды в машинный код в зависимости от типа команды
+        Метод для перевода команды в машинный код по таблице команд `utils.isa.ISA`
 
     `print_inner`( : ) -> None:
         Метод для подробного вывода разбиения команды
@@ -147,6 +191,8 @@ class AssemblerConversion():
         self.memory_number_dest = None
         self.type_of_memory_in = None
         self.memory_number_in = None
+        self.type_of_memory_extra = None
+        self.memory_number_extra = None
         self.literal = None
         self.extra_pin = None
 
@@ -154,16 +200,19 @@ class AssemblerConversion():
         self.point_dict = {}
         self.jump_dict = {}
         self.jump_pc = {}
+        self.jump_operands = {}
 
         self.some_massive = []
 
         self.converse_list = []
+        self.optimization_report = None
         
-    def converse_all(self, cmd:list[str], debug_print:bool=False) -> list[int]:
+    def converse_all(self, cmd:list[str], debug_print:bool=False, optimize:bool=False) -> list[int]:
         """Метод для перевода программы на самоопределённом языке ассемблера в программу на машинном коде
 
         Метод сначала по очереди обрабатывает все команды, запоминая все метки и прыжки, если они есть.
-        После первого этапа конверсии проводится вторая, где все команды прыжков дозаполняются по меткам
+        После первого этапа конверсии проводится вторая, где все команды прыжков дозаполняются по меткам.
+        При `optimize` = True после этого программа проходит через `AssemblerOptimizer`
         
         Parameters
         ----------
@@ -173,6 +222,9 @@ class AssemblerConversion():
         `debug_print` : bool = False
             Метка, нужно ли подробно расписывать процесс конверсии в консоль
         
+        `optimize` : bool = False
+            Метка, нужно ли оптимизировать программу (см. `AssemblerOptimizer`)
+        
         Returns
         -------
         `self.converse_list` : list[int]
@@ -188,6 +240,13 @@ class AssemblerConversion():
         # Заполнение кодами для команд типа jump с метками
         self.fill_jumps()
 
+        if optimize:
+            optimizer = AssemblerOptimizer()
+            self.converse_list = optimizer.optimize(self.converse_list)
+            self.optimization_report = optimizer.report
+            if debug_print:
+                print(optimizer)
+
         return self.converse_list
     
     def converse(self, cmd:str, debug_print:bool=False) -> int:
@@ -209,13 +268,21 @@ class AssemblerConversion():
         Returns
         -------
         `m_command` : int
-            Переведённая команда на машинном коде
+            Переведённая команда на машинном коде. -2, если строка не даёт команды (`set` или метка без команды)
         """
         # Лексический анализ
         cmd_split = self.split_command(cmd)
         if debug_print:
             print(cmd_split)
 
+        # Метка - первое слово строки с двоеточием, например, L1: add r0, r2, поэтому она может совпадать с мнемоникой (loop:).
+        # Метка без команды, например, finish:, ведёт на следующую команду или в конец программы
+        if re.match(r"\s*[^\s,:]+\s*:", cmd):
+            self.point_dict[cmd_split[0]] = self.pc
+            cmd_split = cmd_split[1:]
+            if not cmd_split:
+                return -2
+
         # Проверка и представление в числах
         self.transform_command(cmd_split)
         if debug_print:
@@ -242,9 +309,10 @@ class AssemblerConversion():
                 name_point = self.jump_dict[i]
                 number_point = self.point_dict[name_point]
                 self.literal = number_point
-                self.converse_list[i] = self.make_jump(type_jump)
+                kinds, values = self.jump_operands.get(i, ((), []))
+                self.converse_list[i] = self.make_jump(type_jump, kinds, values)
     
-    def make_jump(self, type_of_jump:Literal["js", "jns", "je" "jne"]) -> int:
+    def make_jump(self, type_of_jump:Literal["js", "jns", "je" "jne", "loop"], kinds:tuple = (), values:list = ()) -> int:
         """Создание команды на машинном коде для команды прыжка
         
         Используя тип команды, что передаётся в метод, и внутреннюю переменную `literal`, 
@@ -252,25 +320,21 @@ class AssemblerConversion():
 
         Parameters
         ----------
-        `type_of_jump` : Literal["js", "jns", "je" "jne"]
-            Тип прыжка (js, jns, je или jne)
-        """
-        match type_of_jump:
-            case "js":
-                cmdtype = 0xB0000000
-            case "jns":
-                cmdtype = 0xC0000000
-            case "je":
-                cmdtype = 0xF0000000
-            case "jne":
-                cmdtype = 0xD0000000
-        
-        literal, op2 = self.standart_literal()
-        dest = 0x00000000
-        op1 = 0x00000000
+        `type_of_jump` : Literal["js", "jns", "je" "jne", "loop"]
+            Тип прыжка (js, jns, je, jne или loop)
 
-        out_command = cmdtype + literal + dest + op1 + op2
-        return out_command
+        `kinds` : tuple = ()
+            Виды операндов перед меткой (у `loop` - регистр)
+
+        `values` : list = ()
+            Значения операндов перед меткой
+        
+        Returns
+        -------
+        int
+            Команда прыжка на машинном коде
+        """
+        return isa.find(type_of_jump, tuple(kinds) + ("label",)).encode(list(values) + [self.literal])
 
     def split_command(self, cmd:str) -> list[str]:
         """Метод для разбиения исходной команды на список
@@ -293,7 +357,7 @@ class AssemblerConversion():
         """Разбиение операнда на тип и адрес
         
         Выделяет тип массива и адрес в массиве. 
-        Обрабатывает также ссылки (которые обозначены как []) и просто числовые значения для перемещения их в literal
+        Обрабатывает также ссылки (которые обозначены как [], их тип записывается как `[r]`) и просто числовые значения для перемещения их в literal
 
         Parameters
         ----------
@@ -308,7 +372,7 @@ class AssemblerConversion():
             Адрес в массиве или значение literal
         """
         if attr[0] == "[":
-            dest = attr[1]
+            dest = f"[{attr[1]}]"
             number = attr[2:-1]
             self.extra_pin = 2
             return dest, int(number)
@@ -335,43 +399,50 @@ class AssemblerConversion():
         
         Не правильная команда, слишком много переменных : `ValueError`
             Вызывается в случае, если переменных  в команде слишком много. 
-            Т.к. здесь реализация двухадресных команд, то длина команды может быть от 2 до 4 единиц, разделённых запятой, двуеточием или пробелом
+            Длина команды может быть от 1 до 4 единиц, разделённых запятой или пробелом: тип команды и до трёх операндов (у блочных команд).
+            Метка перед командой к этому времени уже отделена в `converse`
         """
-        if len(command) == 3: # Стандартная обработка команды, которая выглядит как "<команда> <операнд 1>, <операнд 2>"
+        if command[0] == "set":
+            self.command_type = command[0]
+            massive = command[1:]
+            massive[0] = massive[0][1:]
+            massive[-1] = massive[-1][:-1]
+            self.some_massive = massive
+        elif not isa.is_mnemonic(command[0]):
+            raise ValueError("Не существует команды", command[0])
+        elif len(command) == 3 and isa.is_jump(command[0]): # Обработка прыжка с операндом, например, loop r2 L1
+            self.command_type = command[0]
+            self.type_of_memory_dest, self.memory_number_dest = self.split_attribute(command[1])
+            self.jump_dict[self.pc] = command[2]
+            self.jump_pc[self.pc] = self.command_type
+            self.jump_operands[self.pc] = ((self.type_of_memory_dest,), [self.memory_number_dest])
+        elif len(command) == 4: # Блочная команда с тремя операндами, например, fill [r1], r2, r3
+            self.command_type = command[0]
+            self.type_of_memory_dest, self.memory_number_dest = self.split_attribute(command[1])
+            self.type_of_memory_in, self.memory_number_in = self.split_attribute(command[2])
+            self.type_of_memory_extra, self.memory_number_extra = self.split_attribute(command[3])
+            self.extra_pin = 1
+        elif len(command) == 3: # Стандартная обработка команды, которая выглядит как "<команда> <операнд 1>, <операнд 2>"
             self.command_type = command[0]
-            if self.command_type in ["mov", "cmp", "add", "sub"]:
-                self.type_of_memory_dest, self.memory_number_dest = self.split_attribute(command[1])
-                try:
-                    self.literal = int(command[2])
-                    self.extra_pin = 0
-                except ValueError:
-                    self.type_of_memory_in, self.memory_number_in = self.split_attribute(command[2])
-                    if self.extra_pin is None:
-                        self.extra_pin = 1
-                
-            elif self.command_type == "xchg":
-                self.type_of_memory_dest, self.memory_number_dest = self.split_attribute(command[1])
+            self.type_of_memory_dest, self.memory_number_dest = self.split_attribute(command[1])
+            try:
+                self.literal = int(command[2])
+                self.extra_pin = 0
+            except ValueError:
                 self.type_of_memory_in, self.memory_number_in = self.split_attribute(command[2])
-            
-            else:
-                raise ValueError("Не существует команды", self.command_type)
-        else: # Если у нас не 3 элемента, а 2 или 4, то тут присутсвует прыжки или ссылки соответственно, нужна другая обработка
-            if len(command) == 2: # Обработка JS XXXX, где XXXX - это называние любой ссылки (например, L1)
-                self.command_type = command[0]
-                self.jump_dict[self.pc] = command[1]
-                self.jump_pc[self.pc] = self.command_type
-            elif len(command) == 4: # Обработка ссылки с командой, например, L1: add r0, r2
-                self.point_dict[command[0]] = self.pc
-                self.transform_command(command[1:])
-            else:
-                if command[0] == "set":
-                    self.command_type = command[0]
-                    massive = command[1:]
-                    massive[0] = massive[0][1:]
-                    massive[-1] = massive[-1][:-1]
-                    self.some_massive = massive
-                else:
-                    raise ValueError("Не правильная команда, слишком много переменных. Их может быть от 2 до 4, а у вас = ", len(command))
+                if self.extra_pin is None:
+                    self.extra_pin = 1
+        elif len(command) == 2 and isa.is_jump(command[0]): # Обработка JS XXXX, где XXXX - это называние любой ссылки (например, L1)
+            self.command_type = command[0]
+            self.jump_dict[self.pc] = command[1]
+            self.jump_pc[self.pc] = self.command_type
+        elif len(command) == 2: # Команда с одним операндом, например, coreid r0
+            self.command_type = command[0]
+            self.type_of_memory_dest, self.memory_number_dest = self.split_attribute(command[1])
+        elif len(command) == 1: # Команда без операндов, например, barrier
+            self.command_type = command[0]
+        else:
+            raise ValueError("Не правильная команда, слишком много переменных. Их может быть от 1 до 4, а у вас = ", len(command))
     
     def set_data(self) -> list[str]:
         """Специальный метод для обработки команды `set`
@@ -391,89 +462,66 @@ class AssemblerConversion():
         commands.append("mov r0, 0")
         return commands
     
-    def number_10_to_16(self, num:int, literal:bool=False) -> int:
-        """Метод для перевода десятичного значения в шестнадцатеричное
-        
-        Также осуществляется проверка на размер числа
-
-        Parameters
-        ----------
-        `num` : int
-            Число, которое надо перевести
-
-        `literal` : bool = False
-            Флаг для изменения диапазона числа (с [0, 15] до [0, 255]), необходимый для значения literal
-        
-        Returns
-        -------
-        int
-            Число в шестнадцатеричном формате
-        
-        Raises
-        ------
-        Неверный адрес операнда : `ValueError`
-            Если число больше 15 или меньше нуля (при `literal` = False)
-
-        Слишком большое или отрицательное число : `ValueError`
-            Если число больше 256 или меньше нуля (при `literal` = True)
-        """
-        if literal:
-            if num > 0xFFFF and num < 0:
-                raise ValueError("Слишком большое или отрицательное число", num)
-            return "{0:04x}".format(num)
-
-        if num > 15 and num < 0:
-            raise ValueError("Неверный адрес операнда", num)
-        return "{0:01x}".format(num)
-    
-    def standart_literal(self) -> (int, int):
-        """Команда для создания переменных команды operand_2 и literal в случае использования literal
+    def operand_kinds(self) -> tuple:
+        """Метод для определения видов операндов обрабатываемой команды
         
-        literal назначается числом согласно внутреннему параметру, operand_2 = 0
+        Виды операндов (`r`, `d`, `[r]`, `lit`) берутся из внутренних переменных и используются для поиска команды в таблице `utils.isa.ISA`
 
         Returns
         -------
-        `literal` : int
-            Значение literal
-        
-        `op2` : int
-            Значение operand_2 (Ноль в данном случае)
+        `kinds` : tuple[str, ...]
+            Виды операндов в порядке записи в команде
         """
-        literal_num = self.number_10_to_16(num=self.literal, literal=True)
-        literal = int(f"0x0{literal_num}000", base=16)
-        op2 = 0x00000000
-        return literal, op2
+        kinds = []
+        if self.type_of_memory_dest is not None:
+            kinds.append(self.type_of_memory_dest)
+        if self.extra_pin == 0:
+            kinds.append("lit")
+        elif self.type_of_memory_in is not None:
+            kinds.append(self.type_of_memory_in)
+        if self.type_of_memory_extra is not None:
+            kinds.append(self.type_of_memory_extra)
+        return tuple(kinds)
     
-    def standart_operand(self) -> (int, int):
-        """Команда для создания переменных команды operand_2 и literal в случае использования operand_2
-        
-        operand_2 назначается числом согласно внутреннему параметру, literal = 0
+    def operand_values(self) -> list[int]:
+        """Метод для получения значений операндов обрабатываемой команды
 
         Returns
         -------
-        `literal` : int
-            Значение literal (Ноль в данном случае)
-        
-        `op2` : int
-            Значение operand_2
+        `values` : list[int]
+            Адреса или значение literal в порядке записи в команде
         """
-        literal = 0x00000000
-        in_num = self.number_10_to_16(num=self.memory_number_in)
-        op2 = int(f"0x000000{in_num}", base=16)
-        return literal, op2
+        values = []
+        if self.type_of_memory_dest is not None:
+            values.append(self.memory_number_dest)
+        if self.extra_pin == 0:
+            values.append(self.literal)
+        elif self.type_of_memory_in is not None:
+            values.append(self.memory_number_in)
+        if self.type_of_memory_extra is not None:
+            values.append(self.memory_number_extra)
+        return values
     
     def to_command(self) -> int:
-        """Метод для перевода команды в машинный код в зависимости от типа команды
+        """Метод для перевода команды в машинный код по таблице команд `utils.isa.ISA`
         
-        Создаёт команду машинного кода из всех внутренних параметров в зависимости от типа команды.
+        Команда ищется в таблице по типу команды и видам операндов, после чего кодируется битовыми операциями.
         Также создаёт заглушки для прыжков (-1) и команды `set` (-2)
 
         Returns
         -------
         `out_command` : int
             Команда машинного кода
+        
+        Raises
+        ------
+        Не существует команды с такими операндами : `ValueError`
+            Если сочетание типа команды и видов операндов не поддерживается процессором
+
+        Значение не помещается в поле команды : `ValueError`
+            Если адрес или значение literal выходят за размер своего поля
         """
-        if self.command_type in ["js", "jns", "jne", "je"]:
+        if isa.is_jump(self.command_type):
             return -1
         
         if self.command_type == "set":
@@ -481,57 +529,8 @@ class AssemblerConversion():
             self.converse_all(cmd=coms)
             return -2
         
-        match self.command_type:
-            case "mov":
-                if self.extra_pin == 0: # Значение literal
-                    cmdtype = 0x10000000
-                    literal, op2 = self.standart_literal()
-                elif self.extra_pin == 1: # Из какой-то памяти, REG или DMEM
-                    if self.type_of_memory_dest == "r" and self.type_of_memory_in == "r":
-                        cmdtype = 0x00000000
-                    elif self.type_of_memory_dest == "r" and self.type_of_memory_in == "d":
-                        cmdtype = 0x20000000
-                    elif self.type_of_memory_dest == "d" and self.type_of_memory_in == "r":
-                        cmdtype = 0x30000000
-                    literal, op2 = self.standart_operand()
-                elif self.extra_pin == 2: # В регистре лежит ссылка на память в данных
-                    cmdtype = 0xE0000000
-                    literal, op2 = self.standart_operand()
-            
-            case "cmp":
-                if self.extra_pin == 0: # Значение literal
-                    cmdtype = 0xA0000000
-                    literal, op2 = self.standart_literal()
-                else:
-                    cmdtype = 0x90000000
-                    literal, op2 = self.standart_operand()
-            
-            case "add":
-                if self.extra_pin == 0: # Значение literal
-                    cmdtype = 0x60000000
-                    literal, op2 = self.standart_literal()
-                else:
-                    cmdtype = 0x50000000
-                    literal, op2 = self.standart_operand()
-            
-            case "sub":
-                if self.extra_pin == 0: # Значение literal
-                    cmdtype = 0x80000000
-                    literal, op2 = self.standart_literal()
-                else:
-                    cmdtype = 0x70000000
-                    literal, op2 = self.standart_operand()
-            
-            case "xchg":
-                cmdtype = 0x40000000
-                literal, op2 = self.standart_operand()
-            
-        dest = 0x00000000
-        op1_num = self.number_10_to_16(self.memory_number_dest)
-        op1 = int(f"0x00000{op1_num}0", base=16)
-
-        out_command = cmdtype + literal + dest + op1 + op2
-        return out_command
+        instruction = isa.find(self.command_type, self.operand_kinds())
+        return instruction.encode(self.operand_values())
     
     def print_inner(self) -> None:
         """Метод для подробного вывода разбиения команды
@@ -543,6 +542,8 @@ class AssemblerConversion():
         print(f"memory_number_dest = {self.memory_number_dest}")
         print(f"type_of_memory_in = {self.type_of_memory_in}")
         print(f"memory_number_in = {self.memory_number_in}")
+        print(f"type_of_memory_extra = {self.type_of_memory_extra}")
+        print(f"memory_number_extra = {self.memory_number_extra}")
         print(f"literal = {self.literal}")
         print(f"extra_pin = {self.extra_pin}")
     
@@ -553,6 +554,8 @@ class AssemblerConversion():
         self.memory_number_dest = None
         self.type_of_memory_in = None
         self.memory_number_in = None
+        self.type_of_memory_extra = None
+        self.memory_number_extra = None
         self.literal = None
         self.extra_pin = None
         self.some_massive = []
\ No newline at end of file
@@ -0,0 +1,263 @@
+from collections import Counter, OrderedDict
+
+
+class DataCache():
+    """Класс для моделирования кэша памяти данных и сбора статистики обращений к `DMEM`
+
+    Кэш подключается к процессору методом `attach`, который заменяет `DMEM` на `CachedMemory`.
+    Без подключения кэша процессор работает как раньше и ничего не считает.
+
+    Parameters
+    ----------
+    `size` : int = 64
+        Размер кэша в словах (ячейках памяти данных)
+
+    `line_size` : int = 4
+        Размер строки кэша в словах
+
+    `associativity` : int = 2
+        Количество строк в наборе. `size // line_size` - полностью ассоциативный кэш, 1 - кэш прямого отображения
+
+    `replacement` : Literal["lru", "fifo"] = "lru"
+        Политика замещения строки в наборе
+
+    `write_policy` : Literal["write_back", "write_through"] = "write_back"
+        Политика записи
+
+    `write_allocate` : bool = None
+        Загружать ли строку в кэш при промахе записи. По умолчанию да для `write_back` и нет для `write_through`
+
+    `range_size` : int = 16
+        Размер диапазона адресов для статистики по диапазонам
+
+    Attributes
+    ----------
+    `hits`, `misses`, `evictions` : int
+        Общее количество попаданий, промахов и вытеснений строк
+
+    `writebacks` : int
+        Количество записей изменённых строк в память при вытеснении (`write_back`)
+
+    `memory_writes` : int
+        Количество записей в память при `write_through`
+
+    `by_pc` : dict[int, list[int]]
+        Номер команды -> [попадания, промахи, вытеснения]
+
+    `by_range` : dict[int, list[int]]
+        Начало диапазона адресов -> [попадания, промахи, вытеснения]
+
+    `strides` : dict[int, Counter]
+        Номер команды -> сколько раз встретился каждый шаг адреса между соседними обращениями этой команды
+
+    Methods
+    -------
+    `attach`(`cpu` : ProcessorImitation) -> CachedMemory
+        Подключение кэша к памяти данных процессора
+
+    `detach`(`cpu` : ProcessorImitation) -> None
+        Отключение кэша
+
+    `access`(`address` : int, `write` : bool, `pc` : int) -> bool
+        Обращение к кэшу
+
+    `report`( : ) -> str
+        Отчёт о попаданиях, промахах и локальности обращений
+    """
+    def __init__(self, size:int = 64, line_size:int = 4, associativity:int = 2, replacement:str = "lru",
+                 write_policy:str = "write_back", write_allocate:bool = None, range_size:int = 16) -> None:
+        if size <= 0 or line_size <= 0 or associativity <= 0 or size % (line_size * associativity):
+            raise ValueError("Размер кэша должен делиться на размер строки, умноженный на ассоциативность", size, line_size, associativity)
+        if replacement not in ("lru", "fifo"):
+            raise ValueError("Неизвестная политика замещения", replacement)
+        if write_policy not in ("write_back", "write_through"):
+            raise ValueError("Неизвестная политика записи", write_policy)
+
+        self.size = size
+        self.line_size = line_size
+        self.associativity = associativity
+        self.replacement = replacement
+        self.write_policy = write_policy
+        self.write_allocate = write_policy == "write_back" if write_allocate is None else write_allocate
+        self.range_size = range_size
+        self.set_count = size // (line_size * associativity)
+
+        self.clear()
+
+    def clear(self) -> None:
+        """Очистка содержимого кэша и статистики"""
+        # Каждый набор: номер строки -> изменена ли строка (dirty). Порядок ключей - порядок замещения
+        self.sets = [OrderedDict() for _ in range(self.set_count)]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+        self.memory_writes = 0
+        self.by_pc = {}
+        self.by_range = {}
+        self.strides = {}
+        self._last_address = {}
+        self._last_line = None
+        self._same_line = 0
+
+    def attach(self, cpu) -> "CachedMemory":
+        """Подключение кэша к памяти данных процессора: `cpu.DMEM` заменяется на `CachedMemory`"""
+        memory = CachedMemory(cpu.DMEM, self, cpu)
+        cpu.DMEM = memory
+        return memory
+
+    def detach(self, cpu) -> None:
+        """Отключение кэша: `cpu.DMEM` снова становится исходной памятью данных"""
+        if isinstance(cpu.DMEM, CachedMemory):
+            cpu.DMEM = cpu.DMEM.data
+
+    def access(self, address:int, write:bool, pc:int) -> bool:
+        """Обращение к кэшу
+
+        Parameters
+        ----------
+        `address` : int
+            Адрес ячейки памяти данных
+
+        `write` : bool
+            Запись (True) или чтение (False)
+
+        `pc` : int
+            Номер команды, которая обращается к памяти
+
+        Returns
+        -------
+        bool
+            Было ли попадание
+        """
+        line = address // self.line_size
+        lines = self.sets[line % self.set_count]
+        pc_stats = self.by_pc.setdefault(pc, [0, 0, 0])
+        range_stats = self.by_range.setdefault(address - address % self.range_size, [0, 0, 0])
+
+        last = self._last_address.get(pc)
+        if last is not None:
+            self.strides.setdefault(pc, Counter())[address - last] += 1
+        self._last_address[pc] = address
+        if line == self._last_line:
+            self._same_line += 1
+        self._last_line = line
+
+        if write and self.write_policy == "write_through":
+            self.memory_writes += 1
+
+        if line in lines:
+            self.hits += 1
+            pc_stats[0] += 1
+            range_stats[0] += 1
+            if self.replacement == "lru":
+                lines.move_to_end(line)
+            if write and self.write_policy == "write_back":
+                lines[line] = True
+            return True
+
+        self.misses += 1
+        pc_stats[1] += 1
+        range_stats[1] += 1
+        if write and not self.write_allocate:
+            return False
+        if len(lines) >= self.associativity:
+            _, dirty = lines.popitem(last=False)
+            self.evictions += 1
+            pc_stats[2] += 1
+            range_stats[2] += 1
+            if dirty:
+                self.writebacks += 1
+        lines[line] = write and self.write_policy == "write_back"
+        return False
+
+    def hit_rate(self) -> float:
+        """Доля попаданий среди всех обращений"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stride_report(self) -> dict:
+        """Самый частый шаг адреса для каждой команды
+
+        Returns
+        -------
+        dict[int, tuple[int, float]]
+            Номер команды -> (шаг, доля обращений команды с этим шагом)
+        """
+        report = {}
+        for pc, counter in self.strides.items():
+            stride, count = counter.most_common(1)[0]
+            report[pc] = (stride, count / sum(counter.values()))
+        return report
+
+    def report(self) -> str:
+        """Отчёт о попаданиях, промахах и локальности обращений"""
+        total = self.hits + self.misses
+        lines = [
+            f"Кэш: {self.size} слов, строка {self.line_size}, ассоциативность {self.associativity}, "
+            f"{self.replacement}, {self.write_policy}",
+            f"Обращений: {total}, попаданий: {self.hits}, промахов: {self.misses}, "
+            f"доля попаданий: {self.hit_rate():.3f}, вытеснений: {self.evictions}",
+            f"Записей в память: {self.writebacks if self.write_policy == 'write_back' else self.memory_writes}, "
+            f"обращений в ту же строку, что и предыдущее: {self._same_line / total if total else 0.0:.3f}",
+            "По командам (pc: попадания, промахи, вытеснения, основной шаг адреса):",
+        ]
+        strides = self.stride_report()
+        for pc in sorted(self.by_pc, key=lambda pc: -self.by_pc[pc][1]):
+            hits, misses, evictions = self.by_pc[pc]
+            stride = strides.get(pc)
+            stride_text = f"{stride[0]} ({stride[1]:.0%})" if stride else "-"
+            lines.append(f"  {pc}: {hits}, {misses}, {evictions}, {stride_text}")
+        lines.append("По диапазонам адресов (начало: попадания, промахи, вытеснения):")
+        for start in sorted(self.by_range):
+            hits, misses, evictions = self.by_range[start]
+            lines.append(f"  {start}-{start + self.range_size - 1}: {hits}, {misses}, {evictions}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return self.report()
+
+
+class CachedMemory():
+    """Память данных, которая сообщает о каждом обращении в `DataCache`
+
+    Ведёт себя как список: чтение и запись по индексу, `len`, перебор. Перебор, `repr` и сравнение не считаются обращениями
+
+    Parameters
+    ----------
+    `data` : list[int]
+        Исходная память данных, в которой хранятся значения
+
+    `cache` : DataCache
+        Кэш, в котором учитываются обращения
+
+    `cpu` : ProcessorImitation
+        Процессор, из которого берётся номер текущей команды `pc`
+    """
+    def __init__(self, data:list[int], cache:DataCache, cpu) -> None:
+        self.data = data
+        self.cache = cache
+        self.cpu = cpu
+
+    def __getitem__(self, address:int) -> int:
+        value = self.data[address]
+        self.cache.access(address, False, self.cpu.pc)
+        return value
+
+    def __setitem__(self, address:int, value:int) -> None:
+        self.data[address] = value
+        self.cache.access(address, True, self.cpu.pc)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CachedMemory):
+            other = other.data
+        return self.data == other
+
+    def __repr__(self) -> str:
+        return repr(self.data)
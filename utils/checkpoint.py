@@ -0,0 +1,357 @@
+import hashlib
+import os
+import struct
+import time
+import zlib
+from array import array
+
+
+_MAGIC = b"PIMCKPT\x00"
+_VERSION = 2
+# Заголовок: метка, версия, хэш программы, хэш начального состояния, номер записи, шаг, pc, zf, sf, кодирование чисел,
+# вид памяти данных, количество регистров, количество сохранённых значений памяти и размер памяти данных
+_HEADER = struct.Struct("<8sH32s32sQqqBBBBIQQ")
+_CRC = struct.Struct("<I")
+
+# Кодирование чисел: 64-битные со знаком или числа переменной длины (если какое-то не помещается в 64 бита)
+_INT64 = 0
+_VARIABLE = 1
+
+# Вид памяти данных: все ячейки подряд, только ненулевые пары (адрес, значение) для `PagedMemory`
+# или только изменённые ячейки `SharedMemoryView` (сами разделяемые данные не сохраняются)
+_DENSE = 0
+_SPARSE = 1
+_OVERLAY = 2
+
+
+def program_hash(words:list[int]) -> bytes:
+    """SHA-256 программы на машинном коде. По нему контрольная точка сопоставляется с программой"""
+    return hashlib.sha256(struct.pack(f"<{len(words)}Q", *words)).digest()
+
+
+def _layout(memory) -> int:
+    """Вид сохранения памяти данных"""
+    if hasattr(memory, "changes"):
+        return _OVERLAY
+    if hasattr(memory, "items"):
+        return _SPARSE
+    return _DENSE
+
+
+def _memory_values(memory, layout:int) -> list[int]:
+    """Сохраняемые значения памяти данных: все ячейки или пары (адрес, значение) подряд"""
+    if layout == _OVERLAY:
+        return [number for pair in sorted(memory.changes.items()) for number in pair]
+    if layout == _SPARSE:
+        return [number for pair in memory.items() for number in pair]
+    return list(memory)
+
+
+def origin_hash(cpu) -> bytes:
+    """SHA-256 программы, регистров и памяти данных процессора перед запуском
+
+    По нему контрольные точки одного запуска отличаются от точек той же программы с другими начальными данными
+    """
+    digest = hashlib.sha256(program_hash(cpu.CMEM))
+    memory = cpu.DMEM
+    values = [number for pair in memory.items() for number in pair] if _layout(memory) == _SPARSE else list(memory)
+    for numbers in (list(cpu.REG), [len(memory)], values):
+        digest.update(struct.pack("<Q", len(numbers)))
+        digest.update(_pack_numbers(numbers, _VARIABLE))
+    return digest.digest()
+
+
+def _pack_numbers(values:list[int], encoding:int) -> bytes:
+    if encoding == _INT64:
+        return array("q", values).tobytes()
+    parts = []
+    for value in values:
+        raw = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+        parts.append(struct.pack("<H", len(raw)) + raw)
+    return b"".join(parts)
+
+
+def _unpack_numbers(data:bytes, offset:int, count:int, encoding:int) -> (list[int], int):
+    if encoding == _INT64:
+        end = offset + 8 * count
+        values = array("q")
+        values.frombytes(data[offset:end])
+        return values.tolist(), end
+    values = []
+    for _ in range(count):
+        size, = struct.unpack_from("<H", data, offset)
+        offset += 2
+        values.append(int.from_bytes(data[offset:offset + size], "little", signed=True))
+        offset += size
+    return values, offset
+
+
+def encode_state(cpu, origin:bytes = bytes(32), generation:int = 0) -> bytes:
+    """Компактное двоичное представление состояния процессора: REG, DMEM, pc, флаги, количество шагов и хэш программы
+
+    Разреженная память данных (`PagedMemory`) сохраняется только ненулевыми ячейками,
+    память над разделяемыми данными (`SharedMemoryView`) - только изменёнными, остальная - целиком.
+    В конце записывается CRC-32, по которому `decode_state` отличает повреждённые файлы
+
+    Parameters
+    ----------
+    `origin` : bytes = bytes(32)
+        Хэш начального состояния запуска (см. `origin_hash`)
+
+    `generation` : int = 0
+        Порядковый номер записи
+    """
+    layout = _layout(cpu.DMEM)
+    memory = _memory_values(cpu.DMEM, layout)
+    registers = list(cpu.REG)
+    try:
+        body = _pack_numbers(registers, _INT64) + _pack_numbers(memory, _INT64)
+        encoding = _INT64
+    except OverflowError:
+        encoding = _VARIABLE
+        body = _pack_numbers(registers, _VARIABLE) + _pack_numbers(memory, _VARIABLE)
+    header = _HEADER.pack(_MAGIC, _VERSION, program_hash(cpu.CMEM), origin, generation, cpu.steps, -1 if cpu.pc is None else cpu.pc,
+                          cpu.zf, cpu.sf, encoding, layout, len(registers), len(memory), len(cpu.DMEM))
+    data = header + body
+    return data + _CRC.pack(zlib.crc32(data))
+
+
+def decode_state(data:bytes) -> dict:
+    """Разбор представления `encode_state`
+
+    Returns
+    -------
+    dict
+        `hash`, `origin`, `generation`, `steps`, `pc`, `zf`, `sf`, `REG`, `size` - размер памяти данных, `layout` - вид её сохранения,
+        а также `DMEM` (список) или `cells` (dict адрес -> значение для разреженной памяти и изменений над разделяемыми данными)
+
+    Raises
+    ------
+    `ValueError`
+        Если данные повреждены или записаны другой версией
+    """
+    if len(data) < _HEADER.size + _CRC.size:
+        raise ValueError("Файл контрольной точки обрезан", len(data))
+    crc, = _CRC.unpack_from(data, len(data) - _CRC.size)
+    if zlib.crc32(data[:-_CRC.size]) != crc:
+        raise ValueError("Контрольная сумма файла контрольной точки не совпадает")
+    (magic, version, digest, origin, generation, steps, pc, zf, sf, encoding, layout,
+     register_count, memory_count, size) = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Неизвестный формат контрольной точки", magic, version)
+    registers, offset = _unpack_numbers(data, _HEADER.size, register_count, encoding)
+    memory, offset = _unpack_numbers(data, offset, memory_count, encoding)
+    state = {
+        "hash": digest, "origin": origin, "generation": generation, "steps": steps,
+        "pc": None if pc < 0 else pc, "zf": zf, "sf": sf, "REG": registers, "size": size, "layout": layout,
+    }
+    if layout != _DENSE:
+        state["cells"] = dict(zip(memory[::2], memory[1::2]))
+    else:
+        state["DMEM"] = memory
+    return state
+
+
+def _sync_directory(directory:str) -> None:
+    """`fsync` каталога, чтобы переименование файла сохранилось после сбоя. На Windows каталог так открыть нельзя, там это не нужно"""
+    if os.name == "nt":
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class Checkpointer():
+    """Класс для периодического сохранения состояния `ProcessorImitation` на диск и продолжения выполнения после перезапуска
+
+    Программа выполняется быстрым циклом `ProcessorImitation.run` порциями по `interval` шагов, после каждой порции
+    состояние записывается в файл `<path>.<номер записи>.ckpt`. Номер записи растёт с каждой записью, поэтому файлы
+    упорядочены по времени записи, а не по шагу программы. Запись атомарная: сначала во временный файл, `fsync`, затем `os.replace`
+    и `fsync` каталога, поэтому после сбоя на диске остаётся либо старая, либо новая контрольная точка целиком.
+    Хранятся `keep` последних записанных точек, только что записанная не удаляется никогда.
+
+    Каждая точка помечена хэшем начального состояния запуска (`origin_hash`): программы, регистров и памяти данных на момент
+    `resume` или первого `run`. Поэтому `resume` загружает только точки запуска с теми же программой и начальными данными.
+
+    Чтобы сохранение занимало не больше `max_overhead` от времени выполнения, порция удваивается,
+    пока время записи превышает эту долю от времени выполнения порции.
+
+    Порты ввода-вывода не сохраняются: перед каждой записью накопленный вывод передаётся получателям (`flush_ports`),
+    а продолжать чтение входного потока с нужного места должен сам источник
+
+    Parameters
+    ----------
+    `path` : str
+        Путь и начало имени файлов контрольных точек
+
+    `interval` : int = 100000
+        Начальное количество шагов между контрольными точками
+
+    `keep` : int = 2
+        Сколько последних контрольных точек хранить
+
+    `max_overhead` : float = 0.02
+        Допустимая доля времени сохранения от времени выполнения. None - интервал не меняется
+
+    Attributes
+    ----------
+    `origin` : bytes
+        Хэш начального состояния запуска. None до `resume` или первого `run`
+
+    `saves` : int
+        Количество записанных контрольных точек
+
+    `save_time`, `run_time` : float
+        Суммарное время записи и выполнения в секундах
+
+    Methods
+    -------
+    `save`(`cpu` : ProcessorImitation) -> str
+        Запись контрольной точки
+
+    `resume`(`cpu` : ProcessorImitation) -> bool
+        Загрузка последней корректной контрольной точки этого запуска
+
+    `run`(`cpu` : ProcessorImitation, `max_steps` : int = None) -> int
+        Выполнение программы с контрольными точками
+    """
+    def __init__(self, path:str, interval:int = 100000, keep:int = 2, max_overhead:float = 0.02) -> None:
+        if interval <= 0 or keep <= 0:
+            raise ValueError("Интервал и количество хранимых контрольных точек должны быть положительными", interval, keep)
+        self.path = path
+        self.interval = interval
+        self.keep = keep
+        self.max_overhead = max_overhead
+        self.origin = None
+        self.saves = 0
+        self.save_time = 0.0
+        self.run_time = 0.0
+
+    def numbered(self) -> list[tuple[int, str]]:
+        """Файлы контрольных точек с номерами записи от новых к старым"""
+        directory, prefix = os.path.split(os.path.abspath(self.path))
+        found = []
+        for name in os.listdir(directory):
+            if name.startswith(prefix + ".") and name.endswith(".ckpt"):
+                generation = name[len(prefix) + 1:-len(".ckpt")]
+                if generation.isdigit():
+                    found.append((int(generation), os.path.join(directory, name)))
+        return sorted(found, reverse=True)
+
+    def files(self) -> list[str]:
+        """Файлы контрольных точек от новых к старым (по порядку записи)"""
+        return [name for _, name in self.numbered()]
+
+    def save(self, cpu) -> str:
+        """Атомарная запись контрольной точки текущего состояния
+
+        Если `origin` ещё не задан, начальным состоянием запуска считается текущее
+
+        Returns
+        -------
+        str
+            Путь к записанному файлу
+        """
+        started = time.perf_counter()
+        if self.origin is None:
+            self.origin = origin_hash(cpu)
+        cpu.flush_ports()
+        numbered = self.numbered()
+        generation = numbered[0][0] + 1 if numbered else 1
+        data = encode_state(cpu, self.origin, generation)
+        target = os.path.abspath(f"{self.path}.{generation:015d}.ckpt")
+        temporary = target + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, target)
+        _sync_directory(os.path.dirname(target))
+        older = [name for _, name in numbered if name != target]
+        for old in older[self.keep - 1:]:
+            os.remove(old)
+        self.saves += 1
+        self.save_time += time.perf_counter() - started
+        return target
+
+    def resume(self, cpu) -> bool:
+        """Загрузка последней записанной корректной контрольной точки этого запуска
+
+        Начальным состоянием запуска (`origin`) считается состояние `cpu` до загрузки, поэтому вызывается на процессоре,
+        созданном так же, как при первом запуске. Повреждённые файлы, точки других программ и начальных данных,
+        а также точки с другим количеством регистров, размером или видом памяти данных пропускаются.
+        В память данных записываются только ячейки, которые отличаются от текущих, а у `SharedMemoryView` восстанавливаются только изменения
+
+        Returns
+        -------
+        bool
+            Было ли загружено состояние. False - контрольных точек нет и выполнение начнётся сначала
+        """
+        self.origin = origin_hash(cpu)
+        digest = program_hash(cpu.CMEM)
+        memory = cpu.DMEM
+        for name in self.files():
+            try:
+                with open(name, "rb") as file:
+                    state = decode_state(file.read())
+            except (OSError, ValueError, struct.error):
+                continue
+            if state["hash"] != digest or state["origin"] != self.origin:
+                continue
+            if len(state["REG"]) != len(cpu.REG) or state["size"] != len(memory) or state["layout"] != _layout(memory):
+                continue
+            if state["layout"] == _OVERLAY:
+                memory.reset()
+                memory.changes.update(state["cells"])
+            elif state["layout"] == _SPARSE:
+                memory.restore({})
+                for address, value in state["cells"].items():
+                    memory.store(address, value)
+            else:
+                for address, value in enumerate(state["DMEM"]):
+                    if memory[address] != value:
+                        memory[address] = value
+            cpu.REG[:] = state["REG"]
+            cpu.pc = state["pc"]
+            cpu.zf = state["zf"]
+            cpu.sf = state["sf"]
+            cpu.steps = state["steps"]
+            return True
+        return False
+
+    def run(self, cpu, max_steps:int = None) -> int:
+        """Выполнение программы с контрольными точками, продолжая с текущего `pc` (после `resume` - с сохранённого)
+
+        Контрольная точка записывается после каждой порции шагов и после окончания программы.
+        Если `resume` не вызывался, начальным состоянием запуска считается состояние `cpu` перед выполнением
+
+        Parameters
+        ----------
+        `max_steps` : int = None
+            Наибольшее количество шагов за этот вызов
+
+        Returns
+        -------
+        `steps` : int
+            Количество выполненных шагов
+        """
+        if self.origin is None:
+            self.origin = origin_hash(cpu)
+        done = 0
+        while max_steps is None or done < max_steps:
+            chunk = self.interval if max_steps is None else min(self.interval, max_steps - done)
+            started = time.perf_counter()
+            steps = cpu.run(max_steps=chunk)
+            elapsed = time.perf_counter() - started
+            self.run_time += elapsed
+            done += steps
+            saving = self.save_time
+            self.save(cpu)
+            saving = self.save_time - saving
+            if steps < chunk or cpu.pc >= len(cpu.CMEM):
+                break
+            if self.max_overhead is not None and saving > self.max_overhead * elapsed:
+                self.interval *= 2
+        return done
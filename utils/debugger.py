@@ -0,0 +1,254 @@
+from .isa import ISA, decode
+from .processor import ProcessorImitation
+
+
+class StopEvent():
+    """Описание остановки `Debugger`
+
+    Attributes
+    ----------
+    `kind` : Literal["breakpoint", "register", "memory"]
+        Причина остановки: точка останова, изменение регистра или ячейки памяти данных
+
+    `pc` : int
+        Номер команды, на которой произошла остановка
+
+    `index` : int | None
+        Номер регистра или адрес ячейки памяти данных для точек наблюдения
+
+    `old`, `new` : int | None
+        Значение до и после команды для точек наблюдения
+
+    `steps` : int
+        Значение `ProcessorImitation.steps` в момент остановки
+    """
+    def __init__(self, kind:str, pc:int, index:int = None, old:int = None, new:int = None) -> None:
+        self.kind = kind
+        self.pc = pc
+        self.index = index
+        self.old = old
+        self.new = new
+        self.steps = None
+
+    def __repr__(self) -> str:
+        if self.kind == "breakpoint":
+            return f"Точка останова в команде {self.pc}, шаг {self.steps}"
+        where = "REG" if self.kind == "register" else "DMEM"
+        return f"{where}[{self.index}]: {self.old} -> {self.new} в команде {self.pc}, шаг {self.steps}"
+
+
+class _Stop(Exception):
+    """Исключение, которым ловушка прерывает быстрый цикл `ProcessorImitation.run`"""
+    def __init__(self, event:StopEvent) -> None:
+        super().__init__(event)
+        self.event = event
+
+
+class Debugger():
+    """Класс для отладки программ `ProcessorImitation` с точками останова и наблюдения без замедления выполнения
+
+    Точки не проверяются на каждом шаге. Вместо этого в копии предекодированной программы (`ProcessorImitation.predecode`)
+    подменяются только те команды, на которых возможна остановка, а всё остальное выполняется обычным быстрым циклом `ProcessorImitation.run`:
+    - точка останова подменяет команду по своему адресу;
+    - наблюдение за регистром подменяет команды, которые по таблице `utils.isa.ISA` записывают этот регистр;
+    - наблюдение за памятью данных подменяет команды записи в память, кроме прямых записей `mov dX, rY` по другому адресу.
+
+    Parameters
+    ----------
+    `cpu` : ProcessorImitation
+        Процессор с загруженной программой
+
+    Attributes
+    ----------
+    `breakpoints` : dict[int, Callable | None]
+        Точки останова: номер команды -> условие
+
+    `watches` : list[tuple[str, int, Callable | None]]
+        Точки наблюдения: (`register` или `memory`, номер, условие)
+
+    `event` : StopEvent | None
+        Причина последней остановки. None, если программа завершилась или исчерпан `max_steps`
+
+    Methods
+    -------
+    `add_breakpoint`(`pc` : int, `condition` : Callable = None)
+        Точка останова перед выполнением команды `pc`, при наличии условия только если `condition(cpu)` истинно
+
+    `remove_breakpoint`(`pc` : int)
+        Удаление точки останова
+
+    `watch_register`(`index` : int, `condition` : Callable = None)
+        Остановка после команды, изменившей регистр
+
+    `watch_memory`(`address` : int, `condition` : Callable = None)
+        Остановка после команды, изменившей ячейку памяти данных
+
+    `start`(`max_steps` : int = None) -> StopEvent | None
+        Запуск программы с начала
+
+    `run`(`max_steps` : int = None) -> StopEvent | None
+        Продолжение выполнения до остановки, конца программы или `max_steps` команд
+
+    `step`( : ) -> StopEvent | None
+        Выполнение одной команды
+    """
+    def __init__(self, cpu:ProcessorImitation) -> None:
+        self.cpu = cpu
+        self.breakpoints = {}
+        self.watches = []
+        self.event = None
+        self._program = None
+        self._resume = {}
+
+    def add_breakpoint(self, pc:int, condition = None) -> None:
+        """Точка останова перед выполнением команды `pc`
+
+        Parameters
+        ----------
+        `pc` : int
+            Номер команды
+
+        `condition` : Callable = None
+            Условие (`cpu`) -> bool. Проверяется только при попадании на команду `pc`
+        """
+        self.breakpoints[pc] = condition
+        self._program = None
+
+    def remove_breakpoint(self, pc:int) -> None:
+        """Удаление точки останова"""
+        del self.breakpoints[pc]
+        self._program = None
+
+    def watch_register(self, index:int, condition = None) -> None:
+        """Остановка после команды, изменившей значение регистра `index` (и при истинном `condition(cpu)`, если оно есть)
+
+        Raises
+        ------
+        `ValueError`
+            Если регистра с таким номером нет. Иначе ловушка обращалась бы к нему при выполнении и меняла бы ход программы
+        """
+        if not 0 <= index < len(self.cpu.REG):
+            raise ValueError("Номер регистра вне памяти регистров", index)
+        self.watches.append(("register", index, condition))
+        self._program = None
+
+    def watch_memory(self, address:int, condition = None) -> None:
+        """Остановка после команды, изменившей значение ячейки памяти данных `address` (и при истинном `condition(cpu)`, если оно есть)
+
+        Raises
+        ------
+        `ValueError`
+            Если адрес вне памяти данных. Иначе ловушка обращалась бы к нему при выполнении и меняла бы ход программы
+        """
+        if not 0 <= address < len(self.cpu.DMEM):
+            raise ValueError("Адрес вне памяти данных", address)
+        self.watches.append(("memory", address, condition))
+        self._program = None
+
+    def can_write(self, word:int, kind:str, index:int) -> bool:
+        """Может ли команда изменить регистр или ячейку памяти данных"""
+        opcode, literal, dest, op1, op2 = decode(word)
+        instruction = ISA.get(opcode)
+        if instruction is None:
+            return False
+        fields = {"op1": op1, "op2": op2, "literal": literal, "dest": dest}
+        if kind == "register":
+            return any(fields[field] == index for field in instruction.writes)
+        if instruction.memory != "store":
+            return False
+        direct = [fields[field] for operand, field in instruction.operands if operand == "d"]
+        return not direct or index in direct
+
+    def build(self) -> list[tuple]:
+        """Сборка копии предекодированной программы с ловушками на месте точек останова и наблюдения"""
+        decoded = self.cpu.decoded if self.cpu.decoded is not None else self.cpu.predecode()
+        program = list(decoded)
+        for kind, index, condition in self.watches:
+            for pc, word in enumerate(self.cpu.CMEM):
+                if self.can_write(word, kind, index):
+                    program[pc] = _watch_trap(program[pc], pc, kind, index, condition)
+        # Команда без точки останова, чтобы продолжить выполнение с неё после остановки
+        self._resume = {pc: program[pc] for pc in self.breakpoints if pc < len(program)}
+        for pc, condition in self.breakpoints.items():
+            if pc < len(program):
+                program[pc] = _breakpoint_trap(program[pc], pc, condition)
+        self._program = program
+        return program
+
+    def start(self, max_steps:int = None) -> StopEvent | None:
+        """Запуск программы с начала (`pc` = 0, счётчик шагов обнуляется)"""
+        self.cpu.pc = 0
+        self.cpu.steps = 0
+        self.event = None
+        return self.run(max_steps)
+
+    def run(self, max_steps:int = None) -> StopEvent | None:
+        """Продолжение выполнения до остановки, конца программы или `max_steps` команд
+
+        Если предыдущая остановка была на точке останова текущей команды, эта команда сначала выполняется без неё
+
+        Returns
+        -------
+        `event` : StopEvent | None
+            Причина остановки или None
+        """
+        stopped = self.event
+        resume = stopped is not None and stopped.kind == "breakpoint" and self.cpu.pc == stopped.pc
+        return self._continue(max_steps, resume)
+
+    def step(self) -> StopEvent | None:
+        """Выполнение одной команды. Точки наблюдения срабатывают, точка останова на этой команде пропускается"""
+        return self._continue(1, True)
+
+    def _continue(self, max_steps:int, resume:bool) -> StopEvent | None:
+        program = self._program if self._program is not None else self.build()
+        cpu = self.cpu
+        if cpu.pc is None:
+            cpu.pc = 0
+        budget = -1 if max_steps is None else max_steps
+        self.event = None
+        try:
+            if resume and cpu.pc in self._resume and budget != 0:
+                pc = cpu.pc
+                trap = program[pc]
+                program[pc] = self._resume[pc]
+                try:
+                    cpu.run(max_steps=1, program=program)
+                finally:
+                    program[pc] = trap
+                budget -= 1
+            if budget != 0:
+                cpu.run(max_steps=None if budget < 0 else budget, program=program)
+        except _Stop as stop:
+            self.event = stop.event
+            if stop.event.kind != "breakpoint":
+                cpu.steps += 1 # Команда, на которой сработало наблюдение, уже выполнена
+                cpu.cycles += 1
+            self.event.steps = cpu.steps
+        return self.event
+
+
+def _breakpoint_trap(entry:tuple, pc:int, condition):
+    """Подмена команды, которая останавливает выполнение перед ней"""
+    execute, op1, op2, literal, dest = entry
+
+    def trap(cpu, op1, op2, literal, dest):
+        if condition is None or condition(cpu):
+            raise _Stop(StopEvent("breakpoint", pc))
+        execute(cpu, op1, op2, literal, dest)
+    return (trap, op1, op2, literal, dest)
+
+
+def _watch_trap(entry:tuple, pc:int, kind:str, index:int, condition):
+    """Подмена команды, которая останавливает выполнение после неё, если значение регистра или ячейки изменилось"""
+    execute, op1, op2, literal, dest = entry
+
+    def trap(cpu, op1, op2, literal, dest):
+        memory = cpu.REG if kind == "register" else cpu.DMEM
+        old = memory[index]
+        execute(cpu, op1, op2, literal, dest)
+        new = memory[index]
+        if old != new and (condition is None or condition(cpu)):
+            cpu.pc += 1 # Команда выполнена, но цикл `run` прерывается до увеличения pc
+            raise _Stop(StopEvent(kind, pc, index, old, new))
+    return (trap, op1, op2, literal, dest)
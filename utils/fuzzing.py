@@ -0,0 +1,337 @@
+import random
+from multiprocessing import Pool
+
+from . import isa
+from .assembler import AssemblerConversion
+from .debugger import Debugger
+from .processor import ProcessorImitation
+from .timetravel import TimeTravel
+
+
+def reference_engine(cpu:ProcessorImitation, budget:int) -> None:
+    """Эталонное выполнение: каждая команда разбирается `delimeter_command` и выполняется `command`"""
+    steps = 0
+    while cpu.pc < len(cpu.CMEM) and steps < budget:
+        cmdtype, literal, dest, op1, op2 = cpu.delimeter_command(cpu.CMEM[cpu.pc])
+        cpu.command(cmdtype=cmdtype, operand_1=op1, operand_2=op2, literal=literal, dest=dest)
+        steps += 1
+        cpu.steps += 1
+
+
+def run_engine(cpu:ProcessorImitation, budget:int) -> None:
+    """Быстрое выполнение предекодированной программы `ProcessorImitation.run`"""
+    cpu.run(max_steps=budget)
+
+
+def verified_engine(cpu:ProcessorImitation, budget:int) -> None:
+    """Выполнение проверенной программы (`ProcessorImitation.verify`)"""
+    cpu.verify()
+    cpu.run(max_steps=budget)
+
+
+def debugger_engine(cpu:ProcessorImitation, budget:int) -> None:
+    """Выполнение через `Debugger` с точкой наблюдения за регистром 0, которая не останавливает выполнение"""
+    debugger = Debugger(cpu)
+    debugger.watch_register(0, lambda cpu: False)
+    debugger.run(max_steps=budget)
+
+
+def timetravel_engine(cpu:ProcessorImitation, budget:int) -> None:
+    """Выполнение с записью `TimeTravel`, после которого состояние восстанавливается перемещением к концу записи"""
+    recorder = TimeTravel(cpu, interval=16)
+    recorder.record(max_steps=budget)
+    recorder.seek(0)
+    recorder.seek(recorder.steps)
+
+
+# Движки для сравнения с `reference_engine`: имя -> функция (`cpu`, `budget`) -> None
+ENGINES = {
+    "run": run_engine,
+    "verified": verified_engine,
+    "debugger": debugger_engine,
+    "timetravel": timetravel_engine,
+}
+
+
+
+class FuzzCase():
+    """Случай для сравнения движков: программа на языке ассемблера и начальное состояние
+
+    Attributes
+    ----------
+    `lines` : list[str]
+        Программа. Каждая команда имеет метку `L<номер>`, на которую могут ссылаться прыжки
+
+    `registers` : list[int]
+        Начальные значения регистров
+
+    `data` : list[int]
+        Начальная память данных
+    """
+    def __init__(self, lines:list[str], registers:list[int], data:list[int]) -> None:
+        self.lines = lines
+        self.registers = registers
+        self.data = data
+
+    def assemble(self) -> list[int]:
+        """Перевод программы в машинный код через `AssemblerConversion`"""
+        return AssemblerConversion().converse_all(list(self.lines))
+
+    def __repr__(self) -> str:
+        return "\n".join(self.lines + [f"REG = {self.registers}", f"DMEM = {self.data}"])
+
+
+def random_case(rng:random.Random, register_size:int = 4, data_size:int = 8, max_length:int = 16) -> FuzzCase:
+    """Случайная корректная программа и начальное состояние
+
+    Команды выбираются из таблицы `utils.isa.ISA`, поэтому новые команды попадают в проверку без изменений генератора.
+    Команды с портами ввода-вывода не генерируются, т.к. порты у движков не подключены
+
+    Parameters
+    ----------
+    `rng` : random.Random
+        Генератор случайных чисел
+
+    `register_size` : int = 4
+        Количество регистров (от 1 до 16)
+
+    `data_size` : int = 8
+        Размер памяти данных (от 1 до 16)
+
+    `max_length` : int = 16
+        Наибольшее количество команд
+    """
+    instructions = [instruction for instruction in isa.ISA.values() if "p" not in instruction.kinds]
+    length = rng.randint(1, max_length)
+    lines = []
+    for i in range(length):
+        instruction = rng.choice(instructions)
+        operands = []
+        for kind, _ in instruction.operands:
+            match kind:
+                case "r":
+                    operands.append(f"r{rng.randrange(register_size)}")
+                case "[r]":
+                    operands.append(f"[r{rng.randrange(register_size)}]")
+                case "d":
+                    operands.append(f"d{rng.randrange(data_size)}")
+                case "lit":
+                    operands.append(str(rng.choice([0, 1, 2, 3, rng.randint(0, 255)])))
+                case "label":
+                    operands.append(f"L{rng.randrange(length)}")
+        text = instruction.mnemonic if not operands else f"{instruction.mnemonic} {', '.join(operands)}"
+        lines.append(f"L{i}: {text}")
+    registers = [rng.randint(-2, data_size) for _ in range(register_size)]
+    data = [rng.randint(-3, data_size + 1) for _ in range(data_size)]
+    return FuzzCase(lines, registers, data)
+
+
+def outcome(case:FuzzCase, words:list[int], engine, budget:int) -> tuple:
+    """Полное состояние после выполнения случая движком: (REG, DMEM, pc, zf, sf, steps, cycles, ошибка)"""
+    cpu = ProcessorImitation(len(case.registers), list(case.data), list(words))
+    cpu.REG = list(case.registers)
+    cpu.pc = 0
+    error = None
+    try:
+        engine(cpu, budget)
+    except Exception as exception:
+        error = (type(exception).__name__, exception.args)
+    return (list(cpu.REG), list(cpu.DMEM), cpu.pc, cpu.zf, cpu.sf, cpu.steps, cpu.cycles, error)
+
+
+def compare(case:FuzzCase, engines:dict, budget:int) -> list[tuple]:
+    """Сравнение движков с эталоном на одном случае
+
+    Returns
+    -------
+    list[tuple[str, tuple, tuple]]
+        Расхождения: (имя движка, эталонное состояние, состояние движка)
+    """
+    words = case.assemble()
+    expected = outcome(case, words, reference_engine, budget)
+    mismatches = []
+    for name, engine in engines.items():
+        actual = outcome(case, words, engine, budget)
+        if actual != expected:
+            mismatches.append((name, expected, actual))
+    return mismatches
+
+
+def _check_chunk(arguments:tuple) -> (int, list):
+    """Проверка порции случаев в рабочем процессе. Случай с номером i создаётся из зерна seed + i"""
+    seed, start, count, engines, budget, register_size, data_size, max_length = arguments
+    failures = []
+    for index in range(start, start + count):
+        case = random_case(random.Random(seed * 1_000_003 + index), register_size, data_size, max_length)
+        mismatches = compare(case, engines, budget)
+        if mismatches:
+            failures.append((index, mismatches))
+    return count, failures
+
+
+class DifferentialFuzzer():
+    """Класс для дифференциального тестирования движков выполнения программ `ProcessorImitation`
+
+    Случайные корректные программы и данные (`random_case`) переводятся в машинный код через `AssemblerConversion`
+    и выполняются эталонным движком (`reference_engine`, команда за командой через `command`) и каждым проверяемым движком
+    с одинаковым ограничением шагов. После выполнения сравнивается полное состояние: регистры, память данных, `pc`, флаги,
+    количество шагов и тактов и ошибка, если она была. Случаи проверяются порциями в рабочих процессах,
+    а найденные расхождения сокращаются до минимальной программы (`shrink`)
+
+    Parameters
+    ----------
+    `engines` : dict[str, Callable] = None
+        Проверяемые движки: имя -> функция (`cpu`, `budget`) -> None уровня модуля (чтобы её можно было передать в рабочий процесс).
+        По умолчанию `ENGINES`
+
+    `budget` : int = 256
+        Наибольшее количество шагов выполнения одного случая
+
+    `register_size`, `data_size`, `max_length` : int = 4, 8, 16
+        Размеры генерируемых случаев (см. `random_case`)
+
+    `workers` : int = None
+        Количество рабочих процессов. По умолчанию по количеству процессоров, 1 - без рабочих процессов
+
+    `seed` : int = 0
+        Зерно. Случай с номером i всегда одинаков для одного зерна
+
+    `max_shrink` : int = 10
+        Сколько первых расхождений за запуск сокращается. Остальные сохраняются как есть
+
+    Attributes
+    ----------
+    `checked` : int
+        Количество проверенных случаев
+
+    `failures` : list[tuple[int, FuzzCase, list]]
+        Найденные расхождения: (номер случая, сокращённый случай, расхождения на нём)
+
+    Methods
+    -------
+    `run`(`cases` : int, `chunk` : int = 500) -> list
+        Проверка `cases` случаев
+
+    `case`(`index` : int) -> FuzzCase
+        Случай по номеру
+
+    `shrink`(`case` : FuzzCase) -> FuzzCase
+        Сокращение случая с расхождением
+    """
+    def __init__(self, engines:dict = None, budget:int = 256, register_size:int = 4, data_size:int = 8,
+                 max_length:int = 16, workers:int = None, seed:int = 0, max_shrink:int = 10) -> None:
+        if not 1 <= register_size <= 16 or not 1 <= data_size <= 16:
+            raise ValueError("Размеры регистров и памяти данных должны быть от 1 до 16", register_size, data_size)
+        self.engines = dict(ENGINES if engines is None else engines)
+        self.budget = budget
+        self.register_size = register_size
+        self.data_size = data_size
+        self.max_length = max_length
+        self.workers = workers
+        self.seed = seed
+        self.max_shrink = max_shrink
+        self.checked = 0
+        self.failures = []
+
+    def case(self, index:int) -> FuzzCase:
+        """Случай по номеру"""
+        return random_case(random.Random(self.seed * 1_000_003 + index), self.register_size, self.data_size, self.max_length)
+
+    def run(self, cases:int, chunk:int = 500) -> list:
+        """Проверка случаев с номерами от `checked` до `checked` + `cases`
+
+        Parameters
+        ----------
+        `cases` : int
+            Количество случаев
+
+        `chunk` : int = 500
+            Размер порции для рабочего процесса
+
+        Returns
+        -------
+        list[tuple[int, FuzzCase, list]]
+            Расхождения, найденные в этом запуске (первые `max_shrink` сокращены)
+        """
+        settings = (self.engines, self.budget, self.register_size, self.data_size, self.max_length)
+        jobs = [(self.seed, start, min(chunk, self.checked + cases - start)) + settings
+                for start in range(self.checked, self.checked + cases, chunk)]
+        if self.workers == 1:
+            results = map(_check_chunk, jobs)
+            found = self._collect(results)
+        else:
+            with Pool(self.workers) as pool:
+                found = self._collect(pool.imap_unordered(_check_chunk, jobs))
+        found.sort(key=lambda failure: failure[0])
+        shrunk = []
+        for number, (index, _) in enumerate(found):
+            case = self.case(index)
+            if number < self.max_shrink:
+                case = self.shrink(case)
+            shrunk.append((index, case, compare(case, self.engines, self.budget)))
+        self.failures.extend(shrunk)
+        return shrunk
+
+    def _collect(self, results) -> list:
+        found = []
+        for count, failures in results:
+            self.checked += count
+            found.extend(failures)
+        return found
+
+    def fails(self, case:FuzzCase) -> bool:
+        """Есть ли на случае расхождение. Случаи, которые не собираются ассемблером, не считаются"""
+        try:
+            return bool(compare(case, self.engines, self.budget))
+        except (ValueError, KeyError):
+            return False
+
+    def shrink(self, case:FuzzCase) -> FuzzCase:
+        """Сокращение случая с расхождением
+
+        По очереди пробуется удалить каждую команду (прыжки на неё переносятся на следующую команду)
+        и обнулить каждое начальное значение. Изменение оставляется, если расхождение сохраняется. Повторяется, пока что-то меняется
+        """
+        changed = True
+        while changed:
+            changed = False
+            i = 0
+            while i < len(case.lines):
+                candidate = FuzzCase(_remove_line(case.lines, i), case.registers, case.data)
+                if candidate.lines is not None and self.fails(candidate):
+                    case = candidate
+                    changed = True
+                else:
+                    i += 1
+            for name in ("registers", "data"):
+                values = getattr(case, name)
+                for j, value in enumerate(values):
+                    if value == 0:
+                        continue
+                    simpler = values[:j] + [0] + values[j + 1:]
+                    candidate = FuzzCase(case.lines, simpler if name == "registers" else case.registers,
+                                         simpler if name == "data" else case.data)
+                    if self.fails(candidate):
+                        case = candidate
+                        values = simpler
+                        changed = True
+        return case
+
+    def __repr__(self) -> str:
+        return f"Проверено случаев: {self.checked}, расхождений: {len(self.failures)}"
+
+
+def _remove_line(lines:list[str], i:int) -> list[str] | None:
+    """Программа без команды `i`. Прыжки на её метку переносятся на следующую команду. None, если следующей команды нет, а прыжки есть"""
+    label = lines[i].partition(": ")[0]
+    rest = lines[:i] + lines[i + 1:]
+    following = rest[i].partition(": ")[0] if i < len(rest) else None
+    result = []
+    for line in rest:
+        head, _, text = line.partition(": ")
+        if text.replace(",", " ").split()[-1] == label:
+            if following is None:
+                return None
+            text = text[:len(text) - len(label)] + following
+        result.append(f"{head}: {text}")
+    return result
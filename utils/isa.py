@@ -0,0 +1,505 @@
+# Раскладка полей машинной команды: имя поля -> (сдвиг, ширина в битах)
+#
+# В двоичном виде команда выглядит следующим образом:
+# CCCCEEEEEEEELLLLLLLLDDDDXXXXYYYY, где
+# - CCCC - младшие 4 бита кода операции (cmdtype);
+# - EEEEEEEE - старшие биты кода операции (ext), для базовых команд 0-15 равны нулю;
+# - LLLLLLLL - literal;
+# - DDDD - dest, третий регистр для команд, которым он нужен;
+# - XXXX - op1;
+# - YYYY - op2.
+FIELDS = {
+    "cmdtype": (28, 4),
+    "ext": (20, 8),
+    "literal": (12, 8),
+    "dest": (8, 4),
+    "op1": (4, 4),
+    "op2": (0, 4),
+}
+
+# Виды операндов в языке ассемблера: регистр, ячейка памяти данных, ссылка через регистр, число, метка и порт ввода-вывода
+OPERAND_KINDS = ("r", "d", "[r]", "lit", "label", "p")
+
+
+def encode_field(name:str, value:int) -> int:
+    """Помещение значения в поле команды с помощью битовых операций
+
+    Parameters
+    ----------
+    `name` : str
+        Имя поля из `FIELDS`
+
+    `value` : int
+        Значение поля
+
+    Returns
+    -------
+    int
+        Значение, сдвинутое на позицию поля
+
+    Raises
+    ------
+    `ValueError`
+        Если значение не помещается в поле
+    """
+    shift, width = FIELDS[name]
+    if value < 0 or value >> width:
+        raise ValueError("Значение не помещается в поле команды", name, value)
+    return value << shift
+
+
+
+def decode(word:int) -> (int, int, int, int, int):
+    """Разбиение машинной команды на поля
+
+    Parameters
+    ----------
+    `word` : int
+        Машинная команда
+
+    Returns
+    -------
+    `opcode` : int
+        Полный код операции (cmdtype вместе с ext)
+
+    `literal` : int
+        Значение literal
+
+    `dest` : int
+        Номер третьего регистра
+
+    `op1` : int
+        Номер регистра первого операнда
+
+    `op2` : int
+        Номер регистра второго операнда
+    """
+    # Сдвиги и маски соответствуют FIELDS, записаны явно ради скорости
+    opcode = (word >> 28) & 15 | ((word >> 20) & 255) << 4
+    return opcode, (word >> 12) & 255, (word >> 8) & 15, (word >> 4) & 15, word & 15
+
+
+class Instruction():
+    """Описание одной команды процессора
+
+    Parameters
+    ----------
+    `opcode` : int
+        Код операции. Младшие 4 бита попадают в поле cmdtype, остальные в поле ext
+
+    `mnemonic` : str
+        Мнемоника команды в языке ассемблера
+
+    `operands` : tuple[tuple[str, str], ...]
+        Операнды в порядке записи в ассемблере: пары (вид операнда из `OPERAND_KINDS`, поле команды из `FIELDS`)
+
+    `execute` : Callable
+        Семантика команды, функция (`cpu`, `op1`, `op2`, `literal`, `dest`) -> None.
+        Счётчик команд увеличивается после неё в `ProcessorImitation.command`
+
+    `trace` : str
+        Шаблон строки для подробного вывода, в нём доступны {op1}, {op2}, {literal} и {dest}
+
+    `reads` : tuple[str, ...] = ()
+        Поля с номерами регистров, которые команда читает
+
+    `writes` : tuple[str, ...] = ()
+        Поля с номерами регистров, которые команда записывает
+
+    `flags` : Literal["result", "compare", "other"] | None = None
+        Как команда устанавливает флаги: по записанному в op1 результату (`result`),
+        по разности op1 и второго операнда (`compare`), каким-то другим образом (`other`) или не меняет их (None)
+
+    `memory` : Literal["load", "store"] | None = None
+        Обращение команды к состоянию вне регистров и флагов (память данных, номер ядра, синхронизация ядер, порты):
+        только чтение (`load`) или изменение (`store`)
+
+    `cycles` : int = 1
+        Стоимость команды в тактах
+
+    `count` : str = None
+        Поле с номером регистра, в котором блочная команда получает количество ячеек памяти данных.
+        Блочные команды сами проверяют свой диапазон адресов
+
+    `item_cycles` : int = 0
+        Дополнительные такты на каждую ячейку блочной команды
+    """
+    def __init__(self, opcode:int, mnemonic:str, operands:tuple, execute, trace:str,
+                 reads:tuple = (), writes:tuple = (), flags:str = None, memory:str = None,
+                 cycles:int = 1, count:str = None, item_cycles:int = 0) -> None:
+        self.opcode = opcode
+        self.mnemonic = mnemonic
+        self.operands = operands
+        self.execute = execute
+        self.trace = trace
+        self.reads = reads
+        self.writes = writes
+        self.flags = flags
+        self.memory = memory
+        self.cycles = cycles
+        self.count = count
+        self.item_cycles = item_cycles
+        self.kinds = tuple(kind for kind, _ in operands)
+        self.is_jump = "label" in self.kinds
+        self.base = encode_field("cmdtype", opcode & 15) | encode_field("ext", opcode >> 4)
+
+    def encode(self, values:list[int]) -> int:
+        """Кодирование команды в машинный код
+
+        Parameters
+        ----------
+        `values` : list[int]
+            Значения операндов в порядке `operands`
+
+        Returns
+        -------
+        `word` : int
+            Машинная команда
+        """
+        if len(values) != len(self.operands):
+            raise ValueError("Неверное количество операндов", self.mnemonic, len(values))
+        word = self.base
+        for (_, field), value in zip(self.operands, values):
+            word |= encode_field(field, value)
+        return word
+
+    def cost(self, cpu, op1:int, op2:int, literal:int, dest:int = 0) -> int:
+        """Стоимость команды в тактах. Для блочных команд зависит от количества ячеек, поэтому считается до выполнения команды"""
+        if self.count is None:
+            return self.cycles
+        count = cpu.REG[{"op1": op1, "op2": op2, "dest": dest}[self.count]]
+        return self.cycles + self.item_cycles * max(count, 0)
+
+    def format_trace(self, op1:int, op2:int, literal:int, dest:int = 0) -> str:
+        """Строка подробного вывода для команды с указанными полями"""
+        return self.trace.format(op1=op1, op2=op2, literal=literal, dest=dest)
+
+    def disassemble(self, op1:int, op2:int, literal:int, dest:int = 0) -> str:
+        """Перевод команды обратно в язык ассемблера. Метки прыжков записываются как `L<номер команды>`"""
+        fields = {"op1": op1, "op2": op2, "literal": literal, "dest": dest}
+        parts = []
+        for kind, field in self.operands:
+            value = fields[field]
+            match kind:
+                case "r" | "d" | "p":
+                    parts.append(f"{kind}{value}")
+                case "[r]":
+                    parts.append(f"[r{value}]")
+                case "lit":
+                    parts.append(str(value))
+                case "label":
+                    parts.append(f"L{value}")
+        if not parts:
+            return self.mnemonic
+        return f"{self.mnemonic} {', '.join(parts)}"
+
+    def __repr__(self) -> str:
+        return f"Instruction({self.opcode}, {self.mnemonic!r}, {self.kinds})"
+
+
+# Таблица команд: код операции -> `Instruction`
+ISA = {}
+
+_SYNTAX = {}
+
+
+def register(instruction:Instruction) -> Instruction:
+    """Добавление команды в таблицу `ISA`
+
+    Raises
+    ------
+    `ValueError`
+        Если код операции или сочетание мнемоники и видов операндов уже заняты
+    """
+    key = (instruction.mnemonic, instruction.kinds)
+    if instruction.opcode in ISA:
+        raise ValueError("Код операции уже занят", instruction.opcode)
+    if key in _SYNTAX:
+        raise ValueError("Такая команда уже существует", key)
+    for kind, field in instruction.operands:
+        if kind not in OPERAND_KINDS or field not in FIELDS:
+            raise ValueError("Неизвестный вид операнда или поле", kind, field)
+    ISA[instruction.opcode] = instruction
+    _SYNTAX[key] = instruction
+    return instruction
+
+
+def find(mnemonic:str, kinds:tuple) -> Instruction:
+    """Поиск команды по мнемонике и видам операндов
+
+    Raises
+    ------
+    `ValueError`
+        Если такой команды нет в таблице
+    """
+    try:
+        return _SYNTAX[(mnemonic, tuple(kinds))]
+    except KeyError:
+        raise ValueError("Не существует команды с такими операндами", mnemonic, tuple(kinds)) from None
+
+
+def is_mnemonic(name:str) -> bool:
+    """Является ли слово мнемоникой какой-либо команды"""
+    return any(mnemonic == name for mnemonic, _ in _SYNTAX)
+
+
+def is_jump(mnemonic:str) -> bool:
+    """Является ли мнемоника командой прыжка на метку (метка - последний операнд, например, `js L1` или `loop r0, L1`)"""
+    return any(name == mnemonic and kinds[-1:] == ("label",) for name, kinds in _SYNTAX)
+
+
+def disassemble(words:list[int]) -> list[str]:
+    """Перевод программы на машинном коде в программу на языке ассемблера
+
+    Команды, на которые есть прыжки, получают метки вида `L<номер команды>`.
+    Если есть прыжок на конец программы, в конце добавляется метка без команды `L<длина программы>:`.
+    Прыжки дальше конца программы сохраняются как ссылки на несуществующую метку
+
+    Parameters
+    ----------
+    `words` : list[int]
+        Программа на машинном коде
+
+    Returns
+    -------
+    `lines` : list[str]
+        Программа на языке ассемблера
+    """
+    decoded = []
+    targets = set()
+    for word in words:
+        opcode, literal, dest, op1, op2 = decode(word)
+        if opcode not in ISA:
+            raise ValueError("Неизвестная команда", opcode)
+        decoded.append((ISA[opcode], literal, dest, op1, op2))
+        if ISA[opcode].is_jump:
+            targets.add(literal)
+
+    lines = []
+    for pc, (instruction, literal, dest, op1, op2) in enumerate(decoded):
+        line = instruction.disassemble(op1, op2, literal, dest)
+        if pc in targets:
+            line = f"L{pc}: {line}"
+        lines.append(line)
+    if len(words) in targets:
+        lines.append(f"L{len(words)}:")
+    return lines
+
+
+# Семантика команд
+def _jump(cpu, literal:int) -> None:
+    cpu.pc = literal - 1 # -1, потому что после команды self.pc + 1
+
+def _mov_rr(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.REG[op2]
+
+def _mov_rl(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = literal
+
+def _mov_rd(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.DMEM[op2]
+
+def _mov_dr(cpu, op1, op2, literal, dest):
+    cpu.DMEM[op1] = cpu.REG[op2]
+
+def _xchg(cpu, op1, op2, literal, dest):
+    cpu.REG[op1], cpu.REG[op2] = cpu.REG[op2], cpu.REG[op1]
+
+def _add_rr(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.REG[op1] + cpu.REG[op2]
+    cpu.set_flags(cpu.REG[op1])
+
+def _add_rl(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.REG[op1] + literal
+    cpu.set_flags(cpu.REG[op1])
+
+def _sub_rr(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.REG[op1] - cpu.REG[op2]
+    cpu.set_flags(cpu.REG[op1])
+
+def _sub_rl(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.REG[op1] - literal
+    cpu.set_flags(cpu.REG[op1])
+
+def _cmp_rr(cpu, op1, op2, literal, dest):
+    cpu.set_flags(cpu.REG[op1] - cpu.REG[op2]) # SF = 1: op1 < op2
+
+def _cmp_rl(cpu, op1, op2, literal, dest):
+    cpu.set_flags(cpu.REG[op1] - literal) # SF = 1: op1 < literal
+
+def _js(cpu, op1, op2, literal, dest):
+    if cpu.sf == 1:
+        _jump(cpu, literal)
+
+def _jns(cpu, op1, op2, literal, dest):
+    if cpu.sf == 0:
+        _jump(cpu, literal)
+
+def _jne(cpu, op1, op2, literal, dest):
+    if cpu.zf == 0:
+        _jump(cpu, literal)
+
+def _je(cpu, op1, op2, literal, dest):
+    if cpu.zf == 1:
+        _jump(cpu, literal)
+
+def _mov_rp(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.DMEM[cpu.REG[op2]]
+
+
+def _coreid(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.core_id
+
+def _xadd(cpu, op1, op2, literal, dest):
+    address = cpu.REG[op2]
+    value = cpu.DMEM[address]
+    cpu.DMEM[address] = value + cpu.REG[op1]
+    cpu.REG[op1] = value
+
+def _xchg_rp(cpu, op1, op2, literal, dest):
+    address = cpu.REG[op2]
+    cpu.REG[op1], cpu.DMEM[address] = cpu.DMEM[address], cpu.REG[op1]
+
+def _barrier(cpu, op1, op2, literal, dest):
+    cpu.barrier()
+
+def _port(cpu, number:int):
+    port = cpu.ports.get(number)
+    if port is None:
+        raise ValueError("Порт не подключён", number)
+    return port
+
+def _in(cpu, op1, op2, literal, dest):
+    value = _port(cpu, op2).read()
+    if value is None: # Поток закончился: ZF = 1, в регистр записывается 0
+        cpu.REG[op1] = 0
+        cpu.zf, cpu.sf = 1, 0
+    else:
+        cpu.REG[op1] = value
+        cpu.zf, cpu.sf = 0, 0
+
+def _out(cpu, op1, op2, literal, dest):
+    _port(cpu, op1).write(cpu.REG[op2])
+
+def _loop(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = cpu.REG[op1] - 1
+    if cpu.REG[op1] != 0:
+        _jump(cpu, literal)
+
+def _max_rr(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = max(cpu.REG[op1], cpu.REG[op2])
+
+def _min_rr(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = min(cpu.REG[op1], cpu.REG[op2])
+
+def _max_rp(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = max(cpu.REG[op1], cpu.DMEM[cpu.REG[op2]])
+
+def _min_rp(cpu, op1, op2, literal, dest):
+    cpu.REG[op1] = min(cpu.REG[op1], cpu.DMEM[cpu.REG[op2]])
+
+def _block(cpu, start:int, count:int) -> range:
+    """Адреса диапазона блочной команды. Пустой при count <= 0"""
+    if count <= 0:
+        return range(0)
+    if start < 0 or start + count > len(cpu.DMEM):
+        raise ValueError("Диапазон вне памяти данных", start, count)
+    return range(start, start + count)
+
+def _fill(cpu, op1, op2, literal, dest):
+    value = cpu.REG[op2]
+    for address in _block(cpu, cpu.REG[op1], cpu.REG[dest]):
+        cpu.DMEM[address] = value
+
+def _copy(cpu, op1, op2, literal, dest):
+    source = _block(cpu, cpu.REG[op2], cpu.REG[dest])
+    target = _block(cpu, cpu.REG[op1], cpu.REG[dest])
+    values = [cpu.DMEM[address] for address in source] # Сначала чтение, чтобы пересекающиеся диапазоны копировались верно
+    for address, value in zip(target, values):
+        cpu.DMEM[address] = value
+
+def _sum_block(cpu, op1, op2, literal, dest):
+    addresses = _block(cpu, cpu.REG[op2], cpu.REG[dest])
+    cpu.REG[op1] = cpu.REG[op1] + sum(cpu.DMEM[address] for address in addresses)
+
+def _max_block(cpu, op1, op2, literal, dest):
+    addresses = _block(cpu, cpu.REG[op2], cpu.REG[dest])
+    cpu.REG[op1] = max([cpu.REG[op1]] + [cpu.DMEM[address] for address in addresses])
+
+def _min_block(cpu, op1, op2, literal, dest):
+    addresses = _block(cpu, cpu.REG[op2], cpu.REG[dest])
+    cpu.REG[op1] = min([cpu.REG[op1]] + [cpu.DMEM[address] for address in addresses])
+
+
+R1 = ("r", "op1")
+R2 = ("r", "op2")
+LIT = ("lit", "literal")
+LABEL = ("label", "literal")
+PTR2 = ("[r]", "op2")
+PTR1 = ("[r]", "op1")
+COUNT = ("r", "dest")
+
+register(Instruction(0, "mov", (R1, R2), _mov_rr, "MOV, REG[{op1}] <- REG[{op2}]",
+                     reads=("op2",), writes=("op1",)))
+register(Instruction(1, "mov", (R1, LIT), _mov_rl, "MOV, REG[{op1}] <- {literal}",
+                     writes=("op1",)))
+register(Instruction(2, "mov", (R1, ("d", "op2")), _mov_rd, "MOV, REG[{op1}] <- DMEM[{op2}]",
+                     writes=("op1",), memory="load"))
+register(Instruction(3, "mov", (("d", "op1"), R2), _mov_dr, "MOV, DMEM[{op1}] <- REG[{op2}]",
+                     reads=("op2",), memory="store"))
+register(Instruction(4, "xchg", (R1, R2), _xchg, "XCHG, REG[{op1}] <-> REG[{op2}]",
+                     reads=("op1", "op2"), writes=("op1", "op2")))
+register(Instruction(5, "add", (R1, R2), _add_rr, "ADD, REG[{op1}] <- REG[{op1}] + REG[{op2}]",
+                     reads=("op1", "op2"), writes=("op1",), flags="result"))
+register(Instruction(6, "add", (R1, LIT), _add_rl, "ADD, REG[{op1}] <- REG[{op1}] + {literal}",
+                     reads=("op1",), writes=("op1",), flags="result"))
+register(Instruction(7, "sub", (R1, R2), _sub_rr, "SUB, REG[{op1}] <- REG[{op1}] - REG[{op2}]",
+                     reads=("op1", "op2"), writes=("op1",), flags="result"))
+register(Instruction(8, "sub", (R1, LIT), _sub_rl, "SUB, REG[{op1}] <- REG[{op1}] - {literal}",
+                     reads=("op1",), writes=("op1",), flags="result"))
+register(Instruction(9, "cmp", (R1, R2), _cmp_rr, "CMP, REG[{op1}] - REG[{op2}]",
+                     reads=("op1", "op2"), flags="compare"))
+register(Instruction(10, "cmp", (R1, LIT), _cmp_rl, "CMP, REG[{op1}] - {literal}",
+                     reads=("op1",), flags="compare"))
+register(Instruction(11, "js", (LABEL,), _js, "JS прыжок при SF = 1 в команду {literal}"))
+register(Instruction(12, "jns", (LABEL,), _jns, "JNS прыжок при SF = 0 в команду {literal}"))
+register(Instruction(13, "jne", (LABEL,), _jne, "JNE прыжок при ZF = 0 в команду {literal}"))
+register(Instruction(14, "mov", (R1, PTR2), _mov_rp, "MOV, REG[{op1}] <- DMEM[REG[{op2}]]",
+                     reads=("op2",), writes=("op1",), memory="load"))
+register(Instruction(15, "je", (LABEL,), _je, "JE прыжок при ZF = 1 в команду {literal}"))
+
+# Расширенные команды (код операции >= 16)
+register(Instruction(16, "coreid", (R1,), _coreid, "COREID, REG[{op1}] <- номер ядра",
+                     writes=("op1",), memory="load"))
+register(Instruction(17, "xadd", (R1, PTR2), _xadd, "XADD, REG[{op1}] <- DMEM[REG[{op2}]], DMEM[REG[{op2}]] += REG[{op1}]",
+                     reads=("op1", "op2"), writes=("op1",), memory="store"))
+register(Instruction(18, "xchg", (R1, PTR2), _xchg_rp, "XCHG, REG[{op1}] <-> DMEM[REG[{op2}]]",
+                     reads=("op1", "op2"), writes=("op1",), memory="store"))
+register(Instruction(19, "barrier", (), _barrier, "BARRIER, ожидание остальных ядер",
+                     memory="store"))
+register(Instruction(20, "in", (R1, ("p", "op2")), _in, "IN, REG[{op1}] <- PORT[{op2}], ZF = 1 в конце потока",
+                     writes=("op1",), flags="other", memory="store"))
+register(Instruction(21, "out", (("p", "op1"), R2), _out, "OUT, PORT[{op1}] <- REG[{op2}]",
+                     reads=("op2",), memory="store"))
+
+# Команды циклов и блочные команды. Количество ячеек блочной команды берётся из регистра в поле dest
+register(Instruction(22, "loop", (R1, LABEL), _loop, "LOOP, REG[{op1}] -= 1, прыжок в команду {literal} при REG[{op1}] != 0",
+                     reads=("op1",), writes=("op1",)))
+register(Instruction(23, "max", (R1, R2), _max_rr, "MAX, REG[{op1}] <- max(REG[{op1}], REG[{op2}])",
+                     reads=("op1", "op2"), writes=("op1",)))
+register(Instruction(24, "min", (R1, R2), _min_rr, "MIN, REG[{op1}] <- min(REG[{op1}], REG[{op2}])",
+                     reads=("op1", "op2"), writes=("op1",)))
+register(Instruction(25, "max", (R1, PTR2), _max_rp, "MAX, REG[{op1}] <- max(REG[{op1}], DMEM[REG[{op2}]])",
+                     reads=("op1", "op2"), writes=("op1",), memory="load"))
+register(Instruction(26, "min", (R1, PTR2), _min_rp, "MIN, REG[{op1}] <- min(REG[{op1}], DMEM[REG[{op2}]])",
+                     reads=("op1", "op2"), writes=("op1",), memory="load"))
+register(Instruction(27, "fill", (PTR1, R2, COUNT), _fill, "FILL, DMEM[REG[{op1}]:+REG[{dest}]] <- REG[{op2}]",
+                     reads=("op1", "op2", "dest"), memory="store", count="dest", item_cycles=1))
+register(Instruction(28, "copy", (PTR1, PTR2, COUNT), _copy, "COPY, DMEM[REG[{op1}]:+REG[{dest}]] <- DMEM[REG[{op2}]:+REG[{dest}]]",
+                     reads=("op1", "op2", "dest"), memory="store", count="dest", item_cycles=1))
+register(Instruction(29, "sum", (R1, PTR2, COUNT), _sum_block, "SUM, REG[{op1}] <- REG[{op1}] + сумма DMEM[REG[{op2}]:+REG[{dest}]]",
+                     reads=("op1", "op2", "dest"), writes=("op1",), memory="load", count="dest", item_cycles=1))
+register(Instruction(30, "max", (R1, PTR2, COUNT), _max_block, "MAX, REG[{op1}] <- max(REG[{op1}], DMEM[REG[{op2}]:+REG[{dest}]])",
+                     reads=("op1", "op2", "dest"), writes=("op1",), memory="load", count="dest", item_cycles=1))
+register(Instruction(31, "min", (R1, PTR2, COUNT), _min_block, "MIN, REG[{op1}] <- min(REG[{op1}], DMEM[REG[{op2}]:+REG[{dest}]])",
+                     reads=("op1", "op2", "dest"), writes=("op1",), memory="load", count="dest", item_cycles=1))
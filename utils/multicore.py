@@ -0,0 +1,285 @@
+from .processor import ProcessorImitation
+from .shared import SharedData
+
+
+class Core(ProcessorImitation):
+    """Ядро `MultiCoreImitation`: обычный `ProcessorImitation` со своим номером, который умеет ждать на барьере
+
+    Parameters
+    ----------
+    `core_id` : int
+        Номер ядра
+
+    `register_size` : int
+        Количество регистров ядра
+
+    `data_memory` : list[int]
+        Общая для всех ядер память данных
+
+    `command_memory` : list[int]
+        Память команд ядра
+
+    Attributes
+    ----------
+    `waiting` : bool
+        Ждёт ли ядро на барьере
+
+    `steps` : int
+        Количество выполненных ядром команд
+
+    `clock` : int
+        Локальное время ядра в тактах (см. `utils.isa.Instruction.cost`) с учётом ожидания на барьерах
+    """
+    def __init__(self, core_id:int, register_size:int, data_memory:list[int], command_memory:list[int]) -> None:
+        super().__init__(register_size, data_memory, command_memory)
+        self.core_id = core_id
+        self.pc = 0
+        self.waiting = False
+        self.steps = 0
+        self.clock = 0
+
+    def barrier(self) -> None:
+        """Ядро останавливается до тех пор, пока все работающие ядра не дойдут до барьера"""
+        self.waiting = True
+
+    def halted(self) -> bool:
+        """Закончило ли ядро выполнение программы"""
+        return self.pc >= len(self.CMEM)
+
+    def step(self) -> (int, int, int, int, int):
+        """Выполнение одной команды
+
+        Returns
+        -------
+        tuple[int, int, int, int, int]
+            Поля выполненной команды (см. `delimeter_command`)
+        """
+        fields = self.delimeter_command(self.CMEM[self.pc])
+        cmdtype, literal, dest, op1, op2 = fields
+        cycles = self.cycles
+        self.command(cmdtype=cmdtype, operand_1=op1, operand_2=op2, literal=literal, dest=dest)
+        self.steps += 1
+        self.clock += self.cycles - cycles
+        return fields
+
+
+class MultiCoreImitation():
+    """Класс для реализации модели многоядерного процессора с общей памятью данных
+
+    Каждое ядро (`Core`) имеет свои регистры `REG`, счётчик команд `pc` и флаги, а память данных `DMEM` у всех ядер одна.
+    Ядра выполняются по очереди детерминированным планировщиком, поэтому результат программы всегда воспроизводим.
+
+    Пример программы - `programs/find_max_multicore.txt`: поиск максимума ровно на 4 ядрах. В d0 записывается количество чисел (не больше 10),
+    сами числа - в d1..d10, максимум записывается в d11, а d12-d15 занимают максимумы ядер, поэтому памяти данных нужно не меньше 16 ячеек.
+    Если чисел нет, d11 не меняется
+
+    Parameters
+    ----------
+    `cores` : int
+        Количество ядер
+
+    `register_size` : int
+        Количество регистров в каждом ядре
+
+    `data_memory` : list[int] | int | SharedData = 4
+        Общая память данных. Список с данными, размер памяти, заполненной нулями, или данные в разделяемой памяти (см. `utils.shared`)
+
+    `command_memory` : list[int] | list[list[int]] = None
+        Память команд. Одна программа для всех ядер или отдельная программа для каждого ядра
+
+    `scheduler` : str | list[int] | Callable = "round_robin"
+        Порядок выполнения ядер:
+        - `round_robin` - ядра выполняются по кругу, каждое по `quantum` команд;
+        - list[int] - заданное чередование номеров ядер, которое повторяется по кругу (ядра, которые не могут выполняться, пропускаются);
+        - функция (`runnable` : list[int], `step` : int) -> int, которая выбирает номер ядра из списка готовых к выполнению
+
+    `quantum` : int = 1
+        Сколько команд подряд выполняет ядро за один ход
+
+    Attributes
+    ----------
+    `DMEM` : list[int]
+        Общая память данных
+
+    `cores` : list[Core]
+        Ядра процессора
+
+    `steps` : int
+        Общее количество выполненных команд
+
+    `barriers` : int
+        Сколько раз ядра прошли барьер
+
+    `cycles` : int
+        Оценка времени параллельного выполнения: наибольшее локальное время ядра, где на барьере время всех ядер выравнивается по самому позднему
+
+    Methods
+    -------
+    `set_command`(`cmd` : int | list[int], `core` : int = None)
+        Помещение команды в память команд одного или всех ядер
+
+    `command_loop`(`need_print` : bool = False, `max_steps` : int = None)
+        Функция для выполнения программы на всех ядрах
+
+    `clean_reg`( : )
+        Сбрасывает значения регистров всех ядер в ноль
+    """
+    def __init__(self, cores:int, register_size:int, data_memory:list[int]|int|SharedData=4, command_memory=None,
+                 scheduler="round_robin", quantum:int=1) -> None:
+        if type(data_memory) is int:
+            self.DMEM = [0] * data_memory
+        elif isinstance(data_memory, SharedData):
+            self.DMEM = data_memory.view()
+        else:
+            self.DMEM = data_memory
+
+        if command_memory is None:
+            programs = [[] for _ in range(cores)]
+        elif command_memory and type(command_memory[0]) is list:
+            if len(command_memory) != cores:
+                raise ValueError("Количество программ не совпадает с количеством ядер", len(command_memory), cores)
+            programs = command_memory
+        else:
+            programs = [list(command_memory) for _ in range(cores)]
+
+        self.cores = [Core(i, register_size, self.DMEM, programs[i]) for i in range(cores)]
+
+        if scheduler != "round_robin" and type(scheduler) is not list and not callable(scheduler):
+            raise ValueError("Неизвестный планировщик", scheduler)
+        self.scheduler = scheduler
+        self.quantum = quantum
+
+        self.steps = 0
+        self.barriers = 0
+        self.cycles = 0
+
+    def set_command(self, cmd:int | list[int], core:int = None) -> None:
+        """Помещение команды в память команд
+
+        Parameters
+        ----------
+        `cmd` : int | list[int]
+            Команда или список команд (см. `ProcessorImitation.set_command`)
+
+        `core` : int = None
+            Номер ядра. Если не указан, команда добавляется всем ядрам
+        """
+        targets = self.cores if core is None else [self.cores[core]]
+        for target in targets:
+            target.set_command(cmd)
+
+    def runnable(self) -> list[int]:
+        """Номера ядер, которые не закончили программу и не ждут на барьере"""
+        return [core.core_id for core in self.cores if not core.halted() and not core.waiting]
+
+    def release_barrier(self) -> bool:
+        """Освобождение ядер на барьере, если все работающие ядра до него дошли
+
+        Returns
+        -------
+        bool
+            Были ли освобождены ядра. False означает, что все ядра закончили программу
+        """
+        waiting = [core for core in self.cores if core.waiting]
+        if not waiting:
+            return False
+        latest = max(core.clock for core in waiting)
+        for core in waiting:
+            core.waiting = False
+            core.clock = latest
+        self.barriers += 1
+        return True
+
+    def choose(self, runnable:list[int], position:int) -> (int, int):
+        """Выбор ядра для следующего хода
+
+        Returns
+        -------
+        `core` : int
+            Номер выбранного ядра
+
+        `position` : int
+            Новая позиция планировщика
+        """
+        if self.scheduler == "round_robin":
+            for shift in range(len(self.cores)):
+                index = (position + shift) % len(self.cores)
+                if index in runnable:
+                    return index, index + 1
+        elif type(self.scheduler) is list:
+            for shift in range(len(self.scheduler)):
+                index = self.scheduler[(position + shift) % len(self.scheduler)]
+                if index in runnable:
+                    return index, position + shift + 1
+            # В чередовании нет ни одного готового ядра, берётся первое из готовых
+            return runnable[0], position
+        else:
+            index = self.scheduler(runnable, self.steps)
+            if index not in runnable:
+                raise ValueError("Планировщик выбрал ядро, которое не может выполняться", index)
+            return index, position
+        return runnable[0], position
+
+    def command_loop(self, need_print:bool = False, max_steps:int = None) -> None:
+        """Функция для выполнения программы на всех ядрах
+
+        Ядра выполняются по очереди согласно планировщику, пока все не закончат свои программы.
+        Когда все работающие ядра ждут на барьере, они освобождаются одновременно.
+
+        Parameters
+        ----------
+        `need_print` : bool = False
+            Необходим ли после каждой команды вывод номера ядра, описания команды и регистров ядра
+
+        `max_steps` : int = None
+            Наибольшее общее количество команд. Защита от бесконечного ожидания в программе
+
+        Raises
+        ------
+        `RuntimeError`
+            Если превышено `max_steps`
+        """
+        for core in self.cores:
+            core.pc = 0
+            core.waiting = False
+            core.steps = 0
+            core.clock = 0
+        self.steps = 0
+        self.barriers = 0
+        position = 0
+
+        while True:
+            runnable = self.runnable()
+            if not runnable:
+                if self.release_barrier():
+                    continue
+                break
+
+            index, position = self.choose(runnable, position)
+            core = self.cores[index]
+            for _ in range(self.quantum):
+                if core.halted() or core.waiting:
+                    break
+                if max_steps is not None and self.steps >= max_steps:
+                    raise RuntimeError("Превышено количество шагов", max_steps)
+                cmdtype, literal, dest, op1, op2 = core.step()
+                self.steps += 1
+                if need_print:
+                    print(f"Ядро {index}: ", end="")
+                    core.print_command(cmdtype=cmdtype, operand_1=op1, operand_2=op2, literal=literal, dest=dest)
+                    print(core.REG)
+
+        self.cycles = max((core.clock for core in self.cores), default=0)
+
+    def clean_reg(self) -> bool:
+        """Сбрасывает значения регистров всех ядер в ноль"""
+        for core in self.cores:
+            core.clean_reg()
+        return True
+
+    def __repr__(self) -> str:
+        return "".join(
+            [f"Ядро {core.core_id}, PC = {core.pc}, SF = {core.sf}, ZF = {core.zf}: {core.REG}\n" for core in self.cores]
+            + ["Общая память данных:\n", str(self.DMEM),
+               "\nКоманд выполнено: ", str(self.steps), ", барьеров: ", str(self.barriers), ", время: ", str(self.cycles)]
+        )
@@ -0,0 +1,522 @@
+from . import isa
+from .processor import ProcessorImitation
+
+
+# Возможные состояния флагов (zf, sf) после `set_flags`
+FLAG_STATES = ((1, 0), (0, 0), (0, 1))
+
+# Обозначение флагов в множествах живых значений
+_FLAGS = "flags"
+
+_REGISTERS = range(16)
+
+
+class _Node():
+    """Команда программы во время оптимизации. Прыжки ссылаются на узел-цель, `None` означает конец программы"""
+    __slots__ = ("instr", "op1", "op2", "literal", "dest", "target")
+
+    def __init__(self, instr:isa.Instruction, op1:int = 0, op2:int = 0, literal:int = 0, dest:int = 0) -> None:
+        self.instr = instr
+        self.op1 = op1
+        self.op2 = op2
+        self.literal = literal
+        self.dest = dest
+        self.target = None
+
+    def registers(self, fields:tuple) -> set:
+        """Номера регистров, записанные в указанных полях"""
+        return {getattr(self, field) for field in fields}
+
+
+class _Scratch(ProcessorImitation):
+    """Пробный процессор для вычисления команд с известными операндами"""
+    def __init__(self, regs:dict, flags:tuple) -> None:
+        self.REG = [regs.get(i, 0) for i in _REGISTERS]
+        self.DMEM = []
+        self.CMEM = []
+        self.pc = 0
+        self.zf, self.sf = flags
+
+
+class _State():
+    """Известные значения на входе в команду: константы в регистрах, флаги и регистр, знак которого отражают флаги"""
+    __slots__ = ("regs", "flags", "source")
+
+    def __init__(self, regs:dict, flags:tuple = None, source:int = None) -> None:
+        self.regs = regs
+        self.flags = flags
+        self.source = source
+
+    def join(self, other:"_State") -> "_State":
+        regs = {reg: value for reg, value in self.regs.items() if other.regs.get(reg) == value}
+        flags = self.flags if self.flags == other.flags else None
+        source = self.source if self.source == other.source else None
+        return _State(regs, flags, source)
+
+    def __eq__(self, other:"_State") -> bool:
+        return self.regs == other.regs and self.flags == other.flags and self.source == other.source
+
+
+class AssemblerOptimizer():
+    """Класс для оптимизации программы на машинном коде перед загрузкой в `ProcessorImitation`
+
+    Программа разбирается по таблице `utils.isa.ISA` в список команд, где прыжки ссылаются на команды, а не на номера,
+    поэтому удаление и перенос команд не ломают метки. После оптимизации номера прыжков пересчитываются заново.
+
+    Оптимизация сохраняет итоговые значения регистров, памяти данных и флагов, а также ошибки обращения к памяти данных:
+    команды, читающие память, не удаляются, даже если их результат не используется. Начальные значения регистров считаются неизвестными.
+
+    Проходы:
+    - `constant_propagation`: распространение констант из `mov rX, literal` (в том числе через условные прыжки),
+            удаление команд, которые ничего не меняют, прыжков, которые никогда не выполняются,
+            недостижимого кода и `cmp rX, 0`, если флаги уже выставлены по значению rX (например, предыдущим `sub`)
+    - `jump_threading`: прыжок на прыжок заменяется прыжком сразу в итоговую команду, прыжки на следующую команду удаляются
+    - `dead_stores`: удаление записей в регистры, которые не читаются до следующей записи (кроме команд, обращающихся к памяти)
+    - `hoist_invariants`: вынос из цикла перед его началом команд, значение которых не меняется внутри цикла
+
+    Attributes
+    ----------
+    `nodes` : list
+        Команды программы во время оптимизации
+
+    `report` : dict[str, int]
+        Сколько команд изменил каждый проход, а также `before`, `after` и `saved` - размер программы до, после и разница
+
+    Methods
+    -------
+    `optimize`(commands : list[int]) -> list[int]
+        Оптимизация программы на машинном коде
+
+    `constant_propagation`( : ) -> bool
+        Распространение констант и удаление лишних команд
+
+    `jump_threading`( : ) -> bool
+        Сокращение цепочек прыжков
+
+    `dead_stores`( : ) -> bool
+        Удаление неиспользуемых записей в регистры
+
+    `hoist_invariants`( : ) -> bool
+        Вынос неизменных команд из циклов
+    """
+    def __init__(self) -> None:
+        self.nodes = []
+        self.report = {}
+
+    def optimize(self, commands:list[int]) -> list[int]:
+        """Оптимизация программы на машинном коде
+
+        Parameters
+        ----------
+        `commands` : list[int]
+            Программа на машинном коде с уже заполненными прыжками
+
+        Returns
+        -------
+        list[int]
+            Оптимизированная программа на машинном коде
+        """
+        self.nodes = self.build(commands)
+        self.report = {
+            "constant_propagation": 0, "constant_folding": 0, "redundant_cmp": 0, "dead_code": 0,
+            "jump_threading": 0, "dead_stores": 0, "hoisted": 0,
+        }
+        while True:
+            while self.constant_propagation() | self.jump_threading() | self.dead_stores():
+                pass
+            if not self.hoist_invariants():
+                break
+
+        self.report["before"] = len(commands)
+        self.report["after"] = len(self.nodes)
+        self.report["saved"] = len(commands) - len(self.nodes)
+        return self.encode()
+
+    def build(self, commands:list[int]) -> list:
+        """Разбор машинного кода в список команд, прыжки за пределы программы ведут в её конец"""
+        nodes = []
+        for word in commands:
+            opcode, literal, dest, op1, op2 = isa.decode(word)
+            if opcode not in isa.ISA:
+                raise ValueError("Неизвестная команда", opcode)
+            nodes.append(_Node(isa.ISA[opcode], op1, op2, literal, dest))
+        for node in nodes:
+            if node.instr.is_jump and node.literal < len(nodes):
+                node.target = nodes[node.literal]
+        return nodes
+
+    def encode(self) -> list[int]:
+        """Перевод списка команд обратно в машинный код с пересчётом номеров прыжков"""
+        index = {id(node): i for i, node in enumerate(self.nodes)}
+        commands = []
+        for node in self.nodes:
+            values = []
+            for kind, field in node.instr.operands:
+                if kind == "label":
+                    values.append(len(self.nodes) if node.target is None else index[id(node.target)])
+                else:
+                    values.append(getattr(node, field))
+            commands.append(node.instr.encode(values))
+        return commands
+
+    def successors(self, i:int) -> list[int]:
+        """Номера команд, в которые может перейти выполнение после команды `i`. Номер `len(nodes)` - конец программы"""
+        node = self.nodes[i]
+        if not node.instr.is_jump:
+            return [i + 1]
+        target = len(self.nodes) if node.target is None else self.nodes.index(node.target)
+        return [i + 1, target]
+
+    def run(self, node:_Node, regs:dict, flags:tuple):
+        """Выполнение команды на пробном процессоре
+
+        Returns
+        -------
+        tuple[dict, tuple, bool] | None
+            Записанные значения регистров, флаги после команды и был ли выполнен прыжок.
+            None, если команда обращается к памяти или читает неизвестный регистр
+        """
+        instr = node.instr
+        if instr.memory is not None or not node.registers(instr.reads) <= regs.keys():
+            return None
+        cpu = _Scratch(regs, flags)
+        # Для прыжков literal = 2, чтобы выполненный прыжок отличался от невыполненного по pc
+        instr.execute(cpu, node.op1, node.op2, 2 if instr.is_jump else node.literal, node.dest)
+        return {reg: cpu.REG[reg] for reg in node.registers(instr.writes)}, (cpu.zf, cpu.sf), cpu.pc != 0
+
+    def taken_states(self, node:_Node):
+        """Состояния флагов, при которых прыжок выполняется, или None, если это зависит не только от флагов"""
+        taken = set()
+        for flags in FLAG_STATES:
+            result = self.run(node, {}, flags)
+            if result is None or result[0]:
+                return None
+            if result[2]:
+                taken.add(flags)
+        return frozenset(taken)
+
+    def outcome(self, node:_Node, state:_State):
+        """Результат команды при известных значениях на входе, если он не зависит от неизвестных флагов"""
+        if not node.instr.is_jump:
+            # Флаги читают только прыжки, поэтому для остальных команд подойдут любые
+            return self.run(node, state.regs, state.flags or FLAG_STATES[0])
+        candidates = [state.flags] if state.flags is not None else FLAG_STATES
+        results = [self.run(node, state.regs, flags) for flags in candidates]
+        if any(result is None for result in results):
+            return None
+        if any(result[0] != results[0][0] or result[2] != results[0][2] for result in results):
+            return None
+        return results[0]
+
+    def second_is_zero(self, node:_Node, regs:dict) -> bool:
+        """Равен ли нулю второй операнд команды сравнения"""
+        kind, field = node.instr.operands[1]
+        if kind == "lit":
+            return node.literal == 0
+        return kind == "r" and regs.get(getattr(node, field)) == 0
+
+    def transfer(self, i:int, state:_State) -> list:
+        """Значения на выходе команды `i` по каждому возможному переходу
+
+        Returns
+        -------
+        list[tuple[int, _State]]
+            Номер следующей команды и известные значения при переходе в неё
+        """
+        node = self.nodes[i]
+        instr = node.instr
+        regs = dict(state.regs)
+        flags = state.flags
+        source = state.source
+        written = node.registers(instr.writes)
+
+        result = self.outcome(node, state)
+        if result is None:
+            for reg in written:
+                regs.pop(reg, None)
+            if instr.flags:
+                flags = None
+        else:
+            regs.update(result[0])
+            if instr.flags:
+                flags = result[1]
+
+        if instr.flags == "result":
+            source = node.op1
+        elif instr.flags == "compare":
+            source = node.op1 if self.second_is_zero(node, state.regs) else None
+        elif instr.flags or source in written:
+            source = None
+
+        out = _State(regs, flags, source)
+        successors = self.successors(i)
+        if instr.is_jump and result is not None:
+            return [(successors[1] if result[2] else successors[0], out)]
+        return [(j, out) for j in successors]
+
+    def analyze(self) -> list:
+        """Прямой анализ известных значений на входе в каждую команду. None - команда недостижима"""
+        n = len(self.nodes)
+        states = [None] * n
+        if n == 0:
+            return states
+        states[0] = _State({})
+        worklist = [0]
+        while worklist:
+            i = worklist.pop()
+            for j, state in self.transfer(i, states[i]):
+                if j >= n:
+                    continue
+                joined = state if states[j] is None else states[j].join(state)
+                if states[j] is None or joined != states[j]:
+                    states[j] = joined
+                    worklist.append(j)
+        return states
+
+    def liveness(self) -> (list, list):
+        """Обратный анализ живых регистров и флагов. В конце программы живы все регистры и флаги
+
+        Returns
+        -------
+        `live_in` : list[set]
+            Живые значения на входе в каждую команду
+
+        `live_out` : list[set]
+            Живые значения на выходе из каждой команды
+        """
+        n = len(self.nodes)
+        everything = set(_REGISTERS) | {_FLAGS}
+        live_in = [set() for _ in range(n)]
+        live_out = [set() for _ in range(n)]
+        successors = [self.successors(i) for i in range(n)]
+        changed = True
+        while changed:
+            changed = False
+            for i in reversed(range(n)):
+                node = self.nodes[i]
+                out = set()
+                for j in successors[i]:
+                    out |= everything if j >= n else live_in[j]
+                uses = node.registers(node.instr.reads)
+                if node.instr.is_jump:
+                    uses.add(_FLAGS)
+                defs = node.registers(node.instr.writes)
+                if node.instr.flags:
+                    defs.add(_FLAGS)
+                new_in = (out - defs) | uses
+                if out != live_out[i] or new_in != live_in[i]:
+                    live_out[i] = out
+                    live_in[i] = new_in
+                    changed = True
+        return live_in, live_out
+
+    def remove(self, dead:list) -> None:
+        """Удаление команд с переносом прыжков на них в следующую оставшуюся команду"""
+        dead_ids = {id(node) for node in dead}
+        redirect = {}
+        following = None
+        for node in reversed(self.nodes):
+            if id(node) in dead_ids:
+                redirect[id(node)] = following
+            else:
+                following = node
+        self.nodes = [node for node in self.nodes if id(node) not in dead_ids]
+        for node in self.nodes:
+            if node.target is not None and id(node.target) in redirect:
+                node.target = redirect[id(node.target)]
+
+    def constant_propagation(self) -> bool:
+        """Распространение констант и удаление лишних команд
+
+        Удаляются недостижимые команды, прыжки, которые никогда не выполняются, команды, не меняющие значений,
+        и сравнения `cmp rX, 0`, если флаги уже выставлены по значению rX.
+        Если удалять нечего, команды с известным результатом заменяются на `mov rX, literal`,
+        что позволяет `dead_stores` удалить вычисления, которые к нему привели.
+
+        Returns
+        -------
+        bool
+            Была ли изменена программа
+        """
+        states = self.analyze()
+        dead = []
+        for node, state in zip(self.nodes, states):
+            if state is None:
+                self.report["dead_code"] += 1
+                dead.append(node)
+                continue
+            instr = node.instr
+            if instr.memory is not None:
+                continue
+            if instr.flags == "compare" and state.source == node.op1 and self.second_is_zero(node, state.regs):
+                self.report["redundant_cmp"] += 1
+                dead.append(node)
+                continue
+            result = self.outcome(node, state)
+            if result is None:
+                continue
+            if instr.is_jump:
+                if not result[2] and not result[0]:
+                    self.report["constant_propagation"] += 1
+                    dead.append(node)
+                continue
+            unchanged = all(state.regs.get(reg) == value for reg, value in result[0].items())
+            if unchanged and (not instr.flags or state.flags == result[1]):
+                self.report["constant_propagation"] += 1
+                dead.append(node)
+        if dead:
+            self.remove(dead)
+            return True
+
+        # Замены меняют флаги, поэтому выполняются только при мёртвых флагах и отдельно от удалений
+        mov_literal = isa.find("mov", ("r", "lit"))
+        _, live_out = self.liveness()
+        changed = False
+        for node, state, live in zip(self.nodes, states, live_out):
+            instr = node.instr
+            if instr is mov_literal or instr.is_jump or instr.memory is not None:
+                continue
+            if instr.flags and _FLAGS in live:
+                continue
+            result = self.outcome(node, state)
+            if result is None or len(result[0]) != 1:
+                continue
+            (reg, value), = result[0].items()
+            if 0 <= value <= 255:
+                node.instr, node.op1, node.op2, node.literal, node.dest = mov_literal, reg, 0, value, 0
+                self.report["constant_folding"] += 1
+                changed = True
+        return changed
+
+    def jump_threading(self) -> bool:
+        """Сокращение цепочек прыжков
+
+        Прыжок на условный прыжок заменяется прыжком в его цель, если условие второго прыжка следует из условия первого,
+        или в команду после него, если условие второго прыжка при этом не может выполниться.
+        Прыжки на следующую команду удаляются.
+
+        Returns
+        -------
+        bool
+            Была ли изменена программа
+        """
+        changed = False
+        dead = []
+        for i, node in enumerate(self.nodes):
+            if not node.instr.is_jump or node.instr.writes:
+                continue
+            taken = self.taken_states(node)
+            original = node.target
+            visited = set()
+            while taken and node.target is not None and node.target.instr.is_jump and id(node.target) not in visited:
+                visited.add(id(node.target))
+                second = self.taken_states(node.target)
+                if second is None:
+                    break
+                if taken <= second:
+                    new_target = node.target.target
+                elif not taken & second:
+                    position = self.nodes.index(node.target) + 1
+                    new_target = self.nodes[position] if position < len(self.nodes) else None
+                else:
+                    break
+                if new_target is node.target:
+                    break
+                node.target = new_target
+            if node.target is not original:
+                self.report["jump_threading"] += 1
+                changed = True
+
+            following = self.nodes[i + 1] if i + 1 < len(self.nodes) else None
+            if node.target is following:
+                self.report["jump_threading"] += 1
+                dead.append(node)
+        self.remove(dead)
+        return changed or bool(dead)
+
+    def dead_stores(self) -> bool:
+        """Удаление записей в регистры и флаги, которые не читаются до следующей записи
+
+        Команды, читающие память данных, не удаляются: при неверном адресе или размере блока они вызывают ошибку,
+        и программа без них завершилась бы там, где исходная останавливается
+
+        Returns
+        -------
+        bool
+            Была ли изменена программа
+        """
+        _, live_out = self.liveness()
+        dead = []
+        for node, live in zip(self.nodes, live_out):
+            instr = node.instr
+            if instr.is_jump or instr.memory is not None or not (instr.writes or instr.flags):
+                continue
+            if node.registers(instr.writes) & live:
+                continue
+            if instr.flags and _FLAGS in live:
+                continue
+            dead.append(node)
+        self.report["dead_stores"] += len(dead)
+        self.remove(dead)
+        return bool(dead)
+
+    def hoist_invariants(self) -> bool:
+        """Вынос неизменных команд из циклов
+
+        Циклом считается участок от команды-заголовка до прыжка назад на неё, в который нет прыжков снаружи, кроме как в заголовок.
+        Команда выносится перед заголовком, если она не обращается к памяти и не меняет флаги, записывает один регистр,
+        который больше нигде в цикле не записывается и не живой на входе в цикл, а читаемые ею регистры в цикле не меняются.
+        Прыжки снаружи цикла в заголовок переносятся на вынесенную команду. За один вызов выносится одна команда.
+        Если команда - сам заголовок, она остаётся на месте, а прыжок назад переносится на следующую команду.
+        В `report` команда учитывается один раз, когда на неё больше не прыгает ни один прыжок назад.
+
+        Returns
+        -------
+        bool
+            Была ли вынесена команда
+        """
+        live_in, _ = self.liveness()
+        for j, jump in enumerate(self.nodes):
+            if not jump.instr.is_jump or jump.target is None:
+                continue
+            h = self.nodes.index(jump.target)
+            if h > j:
+                continue
+            loop = self.nodes[h:j + 1]
+            inner = {id(node) for node in loop[1:]}
+            outside = self.nodes[:h] + self.nodes[j + 1:]
+            if any(node.target is not None and id(node.target) in inner for node in outside):
+                continue
+
+            written = {}
+            for node in loop:
+                for reg in node.registers(node.instr.writes):
+                    written[reg] = written.get(reg, 0) + 1
+            for k, node in enumerate(loop):
+                instr = node.instr
+                if instr.is_jump or instr.memory is not None or instr.flags or len(instr.writes) != 1:
+                    continue
+                reg, = node.registers(instr.writes)
+                if written[reg] != 1 or reg in live_in[h] or node.registers(instr.reads) & written.keys():
+                    continue
+
+                following = loop[k + 1]
+                for other in loop:
+                    if other.target is node:
+                        other.target = following
+                for other in outside:
+                    if other.target is loop[0]:
+                        other.target = node
+                self.nodes.remove(node)
+                self.nodes.insert(h, node)
+                if not any(other.target is node for other in self.nodes[h + 1:]):
+                    self.report["hoisted"] += 1
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        return "".join([
+            "Оптимизация: ", str(self.report.get("before")), " -> ", str(self.report.get("after")),
+            " команд, сэкономлено ", str(self.report.get("saved")), "\n",
+            ", ".join(f"{name} = {count}" for name, count in self.report.items() if name not in ("before", "after", "saved")),
+        ])
@@ -0,0 +1,137 @@
+class PagedMemory():
+    """Разреженная память данных, разбитая на страницы, которые выделяются только при первой записи
+
+    Чтение из невыделенной страницы возвращает 0 без выделения памяти, поэтому память данных
+    может иметь огромный размер, а занимать место только под страницы, в которые программа что-то записала.
+    Подставляется вместо списка в `ProcessorImitation` (`data_memory`) и работает с командами 2, 3, 14 и остальными командами памяти
+
+    Parameters
+    ----------
+    `size` : int
+        Размер памяти данных в ячейках
+
+    `page_size` : int = 256
+        Размер страницы в ячейках
+
+    `values` : dict[int, int] | list[int] = None
+        Начальные значения: адрес -> значение или список значений с нулевого адреса
+
+    Attributes
+    ----------
+    `pages` : dict[int, list[int]]
+        Выделенные страницы: номер страницы -> значения
+
+    `reads`, `writes` : dict[int, int]
+        Количество чтений и записей по номерам страниц
+
+    `zero_reads` : int
+        Количество чтений из невыделенных страниц
+
+    Methods
+    -------
+    `snapshot`( : ) -> dict[int, list[int]]
+        Копия выделенных страниц
+
+    `restore`(`snapshot` : dict[int, list[int]])
+        Восстановление памяти из копии
+
+    `statistics`( : ) -> dict
+        Статистика по страницам
+    """
+    def __init__(self, size:int, page_size:int = 256, values = None) -> None:
+        if size < 0 or page_size <= 0:
+            raise ValueError("Размер памяти не может быть отрицательным, а размер страницы должен быть положительным", size, page_size)
+        self.size = size
+        self.page_size = page_size
+        self.pages = {}
+        self.reads = {}
+        self.writes = {}
+        self.zero_reads = 0
+        if values is not None:
+            items = values.items() if isinstance(values, dict) else enumerate(values)
+            for address, value in items:
+                if value:
+                    self.store(address, value)
+
+    def address(self, address:int) -> int:
+        """Проверка адреса и перевод отрицательного адреса в адрес с конца памяти, как у списка"""
+        if address < 0:
+            address += self.size
+        if not 0 <= address < self.size:
+            raise IndexError("Адрес вне памяти данных", address)
+        return address
+
+    def store(self, address:int, value:int) -> int:
+        """Запись без учёта в статистике. Возвращает номер страницы"""
+        page, offset = divmod(self.address(address), self.page_size)
+        values = self.pages.get(page)
+        if values is None:
+            if not value:
+                return page # Ноль в невыделенной странице уже есть
+            values = self.pages[page] = [0] * self.page_size
+        values[offset] = value
+        return page
+
+    def __getitem__(self, address:int) -> int:
+        page, offset = divmod(self.address(address), self.page_size)
+        self.reads[page] = self.reads.get(page, 0) + 1
+        values = self.pages.get(page)
+        if values is None:
+            self.zero_reads += 1
+            return 0
+        return values[offset]
+
+    def __setitem__(self, address:int, value:int) -> None:
+        page = self.store(address, value)
+        self.writes[page] = self.writes.get(page, 0) + 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        zeros = [0] * self.page_size
+        for page in range((self.size + self.page_size - 1) // self.page_size):
+            values = self.pages.get(page, zeros)
+            yield from values[:self.size - page * self.page_size]
+
+    def items(self):
+        """Перебор ненулевых ячеек (адрес, значение) по возрастанию адреса без перебора невыделенных страниц"""
+        for page in sorted(self.pages):
+            start = page * self.page_size
+            for offset, value in enumerate(self.pages[page]):
+                if value:
+                    yield start + offset, value
+
+    def snapshot(self) -> dict:
+        """Копия выделенных страниц. Её размер пропорционален затронутой памяти, а не размеру памяти данных"""
+        return {page: list(values) for page, values in self.pages.items()}
+
+    def restore(self, snapshot:dict) -> None:
+        """Восстановление памяти из копии `snapshot`. Статистика не меняется"""
+        self.pages = {page: list(values) for page, values in snapshot.items()}
+
+    def statistics(self) -> dict:
+        """Статистика по страницам
+
+        Returns
+        -------
+        dict
+            `pages` - количество выделенных страниц, `allocated` - выделено ячеек,
+            `reads`/`writes` - обращения по страницам, `zero_reads` - чтения из невыделенных страниц
+        """
+        return {
+            "pages": len(self.pages),
+            "allocated": len(self.pages) * self.page_size,
+            "reads": dict(self.reads),
+            "writes": dict(self.writes),
+            "zero_reads": self.zero_reads,
+        }
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PagedMemory):
+            return self.size == other.size and dict(self.items()) == dict(other.items())
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        cells = ", ".join(f"{address}: {value}" for address, value in self.items())
+        return f"PagedMemory({self.size}, {{{cells}}})"
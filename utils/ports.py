@@ -0,0 +1,107 @@
+from itertools import islice
+
+
+def _values(source):
+    """Перебор целых чисел из источника: итерируемого объекта чисел или текстового файла/канала с числами через пробелы и переводы строк"""
+    if hasattr(source, "readline"):
+        return (int(token) for line in source for token in line.split())
+    return iter(source)
+
+
+class InputPort():
+    """Порт ввода для команды `in`
+
+    Значения берутся из источника порциями по `buffer_size`, поэтому в памяти одновременно хранится не больше одной порции,
+    а источник может быть сколь угодно длинным (генератор, файл, канал процесса)
+
+    Parameters
+    ----------
+    `source` : Iterable[int] | TextIO
+        Источник значений: итерируемый объект с целыми числами или текстовый файл (канал) с числами через пробелы и переводы строк
+
+    `buffer_size` : int = 1024
+        Размер порции, которой пополняется буфер
+
+    Attributes
+    ----------
+    `reads` : int
+        Количество прочитанных значений
+
+    `refills` : int
+        Количество пополнений буфера
+    """
+    def __init__(self, source, buffer_size:int = 1024) -> None:
+        if buffer_size <= 0:
+            raise ValueError("Размер буфера должен быть положительным", buffer_size)
+        self.iterator = _values(source)
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.position = 0
+        self.reads = 0
+        self.refills = 0
+
+    def read(self) -> int | None:
+        """Следующее значение или None, если поток закончился"""
+        if self.position == len(self.buffer):
+            self.buffer = list(islice(self.iterator, self.buffer_size))
+            self.position = 0
+            if not self.buffer:
+                return None
+            self.refills += 1
+        value = self.buffer[self.position]
+        self.position += 1
+        self.reads += 1
+        return value
+
+
+class OutputPort():
+    """Порт вывода для команды `out`
+
+    Значения накапливаются в буфере и передаются получателю порциями по `buffer_size`, а также при `flush`
+
+    Parameters
+    ----------
+    `sink` : list | Callable | TextIO = None
+        Получатель: список (значения добавляются в конец), функция, принимающая список значений порции,
+        или текстовый файл (канал), куда значения пишутся по одному в строке. По умолчанию новый список `values`
+
+    `buffer_size` : int = 1024
+        Размер порции
+
+    Attributes
+    ----------
+    `values` : list | None
+        Список-получатель, если он используется
+
+    `writes` : int
+        Количество записанных значений
+    """
+    def __init__(self, sink = None, buffer_size:int = 1024) -> None:
+        if buffer_size <= 0:
+            raise ValueError("Размер буфера должен быть положительным", buffer_size)
+        if sink is None:
+            sink = []
+        self.values = sink if type(sink) is list else None
+        self.sink = sink
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.writes = 0
+
+    def write(self, value:int) -> None:
+        """Запись значения в порт"""
+        self.buffer.append(value)
+        self.writes += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Передача накопленных значений получателю"""
+        if not self.buffer:
+            return
+        if type(self.sink) is list:
+            self.sink.extend(self.buffer)
+        elif hasattr(self.sink, "write"):
+            self.sink.write("".join(f"{value}\n" for value in self.buffer))
+        else:
+            self.sink(self.buffer)
+        self.buffer = []
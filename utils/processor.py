@@ -1,3 +1,27 @@
+from .isa import ISA, decode
+from .shared import SharedData
+from .verifier import check_program
+
+
+def _unknown_command(cmdtype:int):
+    """Семантика для неизвестной команды: ошибка возникает только при её выполнении, как и в `command`"""
+    def execute(cpu, op1, op2, literal, dest):
+        raise ValueError("Неизвестная команда", cmdtype)
+    return execute
+
+
+def _charged(instruction):
+    """Семантика команды для `run`, которая добавляет к `cycles` свою стоимость сверх одного такта"""
+    execute = instruction.execute
+    cost = instruction.cost
+
+    def charged(cpu, op1, op2, literal, dest):
+        extra = cost(cpu, op1, op2, literal, dest) - 1
+        execute(cpu, op1, op2, literal, dest)
+        cpu.cycles += extra
+    return charged
+
+
 class ProcessorImitation():
     """Класс для реализации модели процессорного ядра программно-аппаратного комплекса
 
@@ -6,8 +30,9 @@ class ProcessorImitation():
     `register_size` : int
         Количество регистров, которые могут использоваться в представителе класса
 
-    `data_memory` : list[int] | int = 4
-        Память данных. В формате list[int] кидается массив, который является необходимыми данными, либо в формате int указывается просто размерность памяти данных, которая инициируется нулями
+    `data_memory` : list[int] | int | SharedData = 4
+        Память данных. В формате list[int] кидается массив, который является необходимыми данными, либо в формате int указывается просто размерность памяти данных, которая инициируется нулями.
+        `SharedData` (см. `utils.shared`) - данные в разделяемой памяти, над которыми создаётся `SharedMemoryView` без копирования
 
     `command_memory` : list[int] = None
         Память команд. При наличии сразу при создании класа инициирует внутреннюю память команд. Может проиницировать позже с помощью метода `set_command`
@@ -21,7 +46,7 @@ class ProcessorImitation():
         Память команд
 
     `DMEM` : lsit[int]
-        Память данных
+        Память данных. Может быть заменена объектом с таким же доступом по индексу (например, `CachedMemory` из `utils.cache`, `SharedMemoryView` из `utils.shared` или разреженная `PagedMemory` из `utils.paged`)
 
     `pc` : int
         Счётчик команд
@@ -31,6 +56,25 @@ class ProcessorImitation():
 
     `zf` : int
         Флаг нулевого результата операции (после сложения или вычитания)
+
+    `core_id` : int = 0
+        Номер ядра, который возвращает команда `coreid` (см. `MultiCoreImitation`)
+
+    `steps` : int
+        Количество выполненных команд с последнего запуска `command_loop`
+
+    `cycles` : int
+        Стоимость выполненных команд в тактах (см. `utils.isa.Instruction.cost`) с последнего запуска `command_loop`
+
+    `decoded` : list[tuple] | None
+        Предекодированная память команд для `run`. Сбрасывается в `set_command` и `clean_cmem`
+
+    `verified` : bool
+        Прошла ли память команд проверку `verify`. Тогда `command_loop` без вывода выполняет её по предекодированной таблице.
+        Сбрасывается в `set_command` и `clean_cmem`
+
+    `ports` : dict[int, InputPort | OutputPort]
+        Подключённые порты ввода-вывода для команд `in` и `out` (см. `utils.ports`)
     
     Methods
     ----------
@@ -43,38 +87,54 @@ class ProcessorImitation():
     `command_loop`(`need_print` : bool = True)
         Функция для последовательного применения команд
     
+    `verify`( : ) -> list[tuple]
+        Статическая проверка программы, после которой она выполняется без проверок команд
+    
+    `predecode`( : ) -> list[tuple]
+        Предварительное декодирование памяти команд для `run`
+    
+    `run`(`max_steps` : int = None, `program` : list[tuple] = None) -> int
+        Быстрое выполнение команд без вывода, продолжая с текущего `pc`
+    
     `set_flags`(`result` : int)
         Функция для установки внутренних флагов zf и sf после арифметических операций
     
-    `command`(`cmdtype` : int, `operand_1` : int, `operand_2` : int, `literal` : int)
+    `command`(`cmdtype` : int, `operand_1` : int, `operand_2` : int, `literal` : int, `dest` : int = 0)
         Функция для обработки и применения команды
     
-    `print_command`(`cmdtype` : int, `operand_1` : int, `operand_2` : int, `literal` : int)
+    `print_command`(`cmdtype` : int, `operand_1` : int, `operand_2` : int, `literal` : int, `dest` : int = 0)
         Внутренняя функция, для подробного вывода процесса применения команд
     
+    `barrier`( : )
+        Точка синхронизации ядер для команды `barrier`
+    
+    `connect_port`(`number` : int, `port` : InputPort | OutputPort)
+        Подключение порта ввода-вывода
+    
+    `flush_ports`( : )
+        Передача накопленных значений всех портов вывода получателям
+    
     `clean_cmem`( : )
         Сбрасывает все команды
     
     `clean_reg`( : )
         Сбрасывает значения регистров в ноль
     """
-    def __init__(self, register_size:int, data_memory:list[int]|int=4, command_memory = None) -> None:
+    def __init__(self, register_size:int, data_memory:list[int]|int|SharedData=4, command_memory = None) -> None:
         self.REG = []
         for _ in range(register_size):
             self.REG.append(0)
         
         if type(data_memory) is int:
-            self.DMEM = []
-            for _ in range(data_memory):
-                self.DMEM.append(0)
+            self.DMEM = [0] * data_memory
+        elif isinstance(data_memory, SharedData):
+            self.DMEM = data_memory.view()
         else:
             self.DMEM = data_memory
         if command_memory is None:
             self.CMEM = []
         else:
             self.CMEM = command_memory
-        
-        print(self.DMEM)
 
         # Счётчик команд
         self.pc = None
@@ -82,6 +142,14 @@ class ProcessorImitation():
         # Секция флагов
         self.sf = 0 # Флаг знака результата операции (после сложения или вычитания)
         self.zf = 0 # Флаг нулевого результата операции (после сложения или вычитания)
+
+        self.core_id = 0
+
+        self.steps = 0
+        self.cycles = 0
+        self.decoded = None
+        self.verified = False
+        self.ports = {}
     
     def set_command(self, cmd:int | list[int]) -> None:
         """Помещение команды в память команд
@@ -92,8 +160,9 @@ class ProcessorImitation():
             Команда, поступившая на вход. Может быть как одним значением, так и массивом сразу нескольких команд  
 
             В двочином виде она выглядит примерно следующим образом:  
-            CCCCLLLLLLLLDDDDXXXXYYYY, где 
+            CCCCEEEEEEEELLLLLLLLDDDDXXXXYYYY, где 
             - CCCC - это тип команды (cmdtype);  
+            - EEEEEEEE - старшие биты типа команды для расширенных команд (ext), см. `utils.isa.FIELDS`;  
             - LLLLLLLL - literal, используется, если необходимо взять конретное значение не из памяти регистров;  
             - DDDD - номер регистра, в который надо записать результат (dest);  
             - XXXX - номер регистра, где лежит значение первого операнда (op1);  
@@ -104,6 +173,8 @@ class ProcessorImitation():
         `TypeError`
             Если cmd не является int или list[int]
         """
+        self.decoded = None
+        self.verified = False
         if type(cmd) == int:
             self.CMEM.append(cmd)
         elif type(cmd) == list:
@@ -124,8 +195,9 @@ class ProcessorImitation():
             Команда, поступившая на вход. Может быть как одним значением, так и массивом сразу нескольких команд  
 
             В двочином виде она выглядит примерно следующим образом:  
-            CCCCLLLLLLLLDDDDXXXXYYYY, где 
+            CCCCEEEEEEEELLLLLLLLDDDDXXXXYYYY, где 
             - CCCC - это тип команды (cmdtype);  
+            - EEEEEEEE - старшие биты типа команды для расширенных команд (ext), см. `utils.isa.FIELDS`;  
             - LLLLLLLL - literal, используется, если необходимо взять конретное значение не из памяти регистров;  
             - DDDD - номер регистра, в который надо записать результат (dest);  
             - XXXX - номер регистра, где лежит значение первого операнда (op1);  
@@ -134,7 +206,7 @@ class ProcessorImitation():
         Returns
         ----------
         `cmdtype` : int
-            Тип команды
+            Тип команды (вместе со старшими битами ext)
 
         `literal` : int
             Конкретное значение числа не из памяти регистров
@@ -157,13 +229,7 @@ class ProcessorImitation():
         if cmd > 0xFFFFFFFF:
             raise ValueError("Команда не соответсвует требованиям. Она должна иметь вид CCCCLLLLLLLLDDDDXXXXYYYY", "{0:032b}".format(cmd))
 
-        operand_2 = cmd & 15
-        operand_1 = (cmd >> 4) & 15
-        dest = (cmd >> 8) & 15
-        literal = (cmd >> 12) & 255
-        cmdtype = (cmd >> 28) & 15
-
-        return cmdtype, literal, dest, operand_1, operand_2
+        return decode(cmd)
     
     def command_loop(self, need_print:bool = True) -> None:
         """Функция для последовательного применения команд
@@ -173,18 +239,126 @@ class ProcessorImitation():
         `need_print` : bool = True
             Необходим ли после каждой команды вывод подобного описания команды и результат её выполнения (значения регистров).
         """
+        if need_print:
+            print(self.DMEM)
         N = len(self.CMEM)
         self.pc = 0
+        self.steps = 0
+        self.cycles = 0
+        if self.verified and not need_print:
+            # Проверенная программа без вывода выполняется по предекодированной таблице (`run`): без разбора и поиска команды на каждом шаге
+            self.run()
+            return
         while self.pc < N:
             if need_print:
                 print(self.REG)
             cmd = self.CMEM[self.pc]
-            cmdtype, literal, dest, op1, op2 = self.delimeter_command(cmd)
-            self.command(cmdtype=cmdtype, operand_1=op1, operand_2=op2, literal=literal)
+            # Команды проверенной программы уже проверены в `verify`
+            cmdtype, literal, dest, op1, op2 = decode(cmd) if self.verified else self.delimeter_command(cmd)
+            self.command(cmdtype=cmdtype, operand_1=op1, operand_2=op2, literal=literal, dest=dest)
+            self.steps += 1
             if need_print:
-                self.print_command(cmdtype=cmdtype, operand_1=op1, operand_2=op2, literal=literal)
+                self.print_command(cmdtype=cmdtype, operand_1=op1, operand_2=op2, literal=literal, dest=dest)
                 print(self)
                 print()
+        self.flush_ports()
+    
+    def verify(self) -> list[tuple]:
+        """Статическая проверка программы (см. `utils.verifier.check_program`)
+
+        Доказывает, что метки прыжков не выходят за память команд, номера регистров меньше количества регистров,
+        а прямые адреса памяти данных (команды 2 и 3) меньше её размера. После успешной проверки `predecode` не проверяет
+        каждую команду, а `command_loop` без вывода выполняет программу по предекодированной таблице, как `run`,
+        без разбора и поиска команды на каждом шаге. Поведение программы при этом не меняется: косвенные обращения `[r]`
+        проверяются при выполнении так же, как в `command` (адрес за концом памяти данных вызывает `IndexError`).
+        Если после проверки изменится размер `REG` или `DMEM`, её нужно провести заново
+
+        Returns
+        -------
+        `program` : list[tuple]
+            Предекодированная программа (см. `predecode`)
+
+        Raises
+        ----------
+        `ValueError`
+            Если программа не прошла проверку. Вторым аргументом передаётся список ошибок (номер команды, описание, значение)
+        """
+        problems = check_program(self.CMEM, len(self.REG), len(self.DMEM))
+        if problems:
+            self.verified = False
+            raise ValueError("Программа не прошла проверку", problems)
+        self.verified = True
+        return self.predecode()
+    
+    def predecode(self) -> list[tuple]:
+        """Предварительное декодирование памяти команд для `run`
+
+        Каждая команда один раз разбирается на поля и заменяется на кортеж (семантика команды из `utils.isa.ISA`, op1, op2, literal, dest).
+        Результат сохраняется в `decoded`. Если память команд менялась в обход `set_command`, метод нужно вызвать заново.
+        `run` добавляет к `cycles` по одному такту на команду сразу за весь запуск, а команды с другой стоимостью
+        (см. `utils.isa.Instruction.cost`) добавляют разницу сами.
+        Команды проверенной программы (`verify`) разбираются без проверки каждого слова
+
+        Returns
+        -------
+        `program` : list[tuple]
+            Предекодированная программа
+        """
+        program = []
+        charged = {}
+        for cmd in self.CMEM:
+            cmdtype, literal, dest, op1, op2 = decode(cmd) if self.verified else self.delimeter_command(cmd)
+            instruction = ISA.get(cmdtype)
+            if instruction is None:
+                execute = _unknown_command(cmdtype)
+            elif instruction.cycles != 1 or instruction.count is not None:
+                if cmdtype not in charged:
+                    charged[cmdtype] = _charged(instruction)
+                execute = charged[cmdtype]
+            else:
+                execute = instruction.execute
+            program.append((execute, op1, op2, literal, dest))
+        self.decoded = program
+        return program
+    
+    def run(self, max_steps:int = None, program:list[tuple] = None) -> int:
+        """Быстрое выполнение команд без вывода, продолжая с текущего `pc`
+
+        В отличие от `command_loop` не сбрасывает `pc` (кроме первого запуска, когда `pc` = None) и не декодирует команды на каждом шаге.
+        Порты вывода сбрасываются, только если программа закончилась
+
+        Parameters
+        ----------
+        `max_steps` : int = None
+            Наибольшее количество команд за этот запуск
+
+        `program` : list[tuple] = None
+            Предекодированная программа (см. `predecode`). По умолчанию `decoded`
+
+        Returns
+        -------
+        `steps` : int
+            Количество выполненных команд
+        """
+        if program is None:
+            program = self.decoded if self.decoded is not None else self.predecode()
+        if self.pc is None:
+            self.pc = 0
+        N = len(program)
+        limit = -1 if max_steps is None else max_steps
+        steps = 0
+        try:
+            while self.pc < N and steps != limit:
+                execute, op1, op2, literal, dest = program[self.pc]
+                execute(self, op1, op2, literal, dest)
+                self.pc += 1
+                steps += 1
+        finally:
+            self.steps += steps
+            self.cycles += steps # Остальные такты добавляют команды со стоимостью больше одного такта (см. `predecode`)
+        if self.pc >= N:
+            self.flush_ports()
+        return steps
     
     def set_flags(self, result:int) -> None:
         """Функция для установки внутренних флагов zf и sf после арифметических операций
@@ -216,7 +390,7 @@ class ProcessorImitation():
             self.zf = 0
             self.sf = 1
     
-    def command(self, cmdtype:int, operand_1:int, operand_2:int, literal:int) -> None:
+    def command(self, cmdtype:int, operand_1:int, operand_2:int, literal:int, dest:int = 0) -> None:
         """Функция для обработки и применения команды
         
         Изменяет внутренние параметры (регистры `REG`, память данных `DMEM`, счётчик команд `pc`) в соответствии с типом команды и атрибутами
@@ -235,59 +409,24 @@ class ProcessorImitation():
         `literal` : int
             Конкретное значение числа не из памяти регистров
 
+        `dest` : int = 0
+            Номер третьего регистра. В двухадресных командах не используется, т.к. результат записывается в ячейку первого операнда `operand_1`
+
         Примечание
         ----------
-        `dest` не используется, т.к. в двухадресных командах результат записывается в ячейку первого операнда `operand_1`
+        Семантика каждой команды описана в таблице `utils.isa.ISA`
 
         """
-        match cmdtype:
-            case 0: # MOV, перемещение данных из одного регистра в другой
-                self.REG[operand_1] = self.REG[operand_2]
-            case 1: # MOV, перемещение (установка) из literal (определённого значения) в регистр
-                self.REG[operand_1] = literal
-            case 2: # MOV, перемещение данных из памяти данных в память регистра
-                self.REG[operand_1] = self.DMEM[operand_2]
-            case 3: # MOV, перемещение данных из памяти регистра в память данных
-                self.DMEM[operand_1] = self.REG[operand_2]
-            case 4: # XCHG, поменять содержимое операндов местами
-                self.REG[operand_1], self.REG[operand_2] = self.REG[operand_2], self.REG[operand_1]
-            case 5: # ADD, сложение операндов
-                self.REG[operand_1] = self.REG[operand_1] + self.REG[operand_2]
-                self.set_flags(self.REG[operand_1])
-            case 6: # ADD, сложение операнда с определённым числом
-                self.REG[operand_1] = self.REG[operand_1] + literal
-                self.set_flags(self.REG[operand_1])
-            case 7: # SUB, вычитание операндов
-                self.REG[operand_1] = self.REG[operand_1] - self.REG[operand_2]
-                self.set_flags(self.REG[operand_1])
-            case 8: # SUB, вычитание из операнда числа
-                self.REG[operand_1] = self.REG[operand_1] - literal
-                self.set_flags(self.REG[operand_1])
-            case 9: # CMP, сравнение, вычитание без записи (для флага) операнда
-                temp = self.REG[operand_1] - self.REG[operand_2] # SF = 1: op1 < op2, SF = 0: op1 > op2
-                self.set_flags(temp)
-            case 10: # CMP, сравнение, вычитание без записи (для флага) числа
-                temp = self.REG[operand_1] - literal # SF = 1: op1 < literal, SF = 0: op1 > literal
-                self.set_flags(temp)
-            case 11: # JS прыжок при SF = 1 (т.е. последнее арифметическое действие =< 0)
-                if self.sf == 1:
-                    self.pc = literal - 1 # -1, потому что в конце функции self.pc + 1
-            case 12: # JNS прыжок при SF = 0 (т.е. последнее арифметическое действие >= 0)
-                if self.sf == 0:
-                    self.pc = literal - 1 # -1, потому что в конце функции self.pc + 1
-            case 13: # JNE прыжок при ZF = 0 (т.е. последнее арифметическое действие != 0)
-                if self.zf == 0:
-                    self.pc = literal - 1 # -1, потому что в конце функции self.pc + 1
-            case 14: # MOV rx, [rx], в регистре лежит адрес для данных
-                self.REG[operand_1] = self.DMEM[self.REG[operand_2]]
-            case 15: # JE прыжок при ZF = 1 (т.е. последнее арифметическое действие = 0)
-                if self.zf == 1:
-                    self.pc = literal - 1 # -1, потому что в конце функции self.pc + 1
-            case _:
-                raise ValueError("Неизвестная команда")
+        instruction = ISA.get(cmdtype)
+        if instruction is None:
+            raise ValueError("Неизвестная команда", cmdtype)
+        # Стоимость блочной команды зависит от регистра с количеством ячеек, поэтому считается до выполнения
+        cycles = instruction.cycles if instruction.count is None else instruction.cost(self, operand_1, operand_2, literal, dest)
+        instruction.execute(self, operand_1, operand_2, literal, dest)
+        self.cycles += cycles
         self.pc += 1
     
-    def print_command(self, cmdtype:int, operand_1:int, operand_2:int, literal:int) -> None:
+    def print_command(self, cmdtype:int, operand_1:int, operand_2:int, literal:int, dest:int = 0) -> None:
         """Внутренняя функция, для подробного вывода процесса применения команд
 
         Parameters
@@ -303,46 +442,48 @@ class ProcessorImitation():
         
         `literal` : int
             Конкретное значение числа не из памяти регистров
+
+        `dest` : int = 0
+            Номер третьего регистра
+        """
+        instruction = ISA.get(cmdtype)
+        if instruction is None:
+            raise ValueError("Неизвестная команда", cmdtype)
+        print(instruction.format_trace(op1=operand_1, op2=operand_2, literal=literal, dest=dest))
+    
+    def barrier(self) -> None:
+        """Точка синхронизации ядер для команды `barrier`
+
+        Одиночному ядру ждать некого, поэтому метод ничего не делает. Ядра `MultiCoreImitation` переопределяют его
         """
-        match cmdtype:
-            case 0: # MOV, перемещение данных из одного регистра в другой
-                print(f"MOV, REG[{operand_1}] <- REG[{operand_2}]")
-            case 1: # MOV, перемещение (установка) из literal (определённого значения) в регистр
-                print(f"MOV, REG[{operand_1}] <- {literal}")
-            case 2: # MOV, перемещение данных из памяти данных в память регистра
-                print(f"MOV, REG[{operand_1}] <- DMEM[{operand_2}]")
-            case 3: # MOV, перемещение данных из памяти регистра в память данных
-                print(f"MOV, DMEM[{operand_1}] <- REG[{operand_2}]")
-            case 4: # XCHG, поменять содержимое операндов местами
-                print(f"XCHG, REG[{operand_1}] <-> REG[{operand_2}]")
-            case 5: # ADD, сложение операндов
-                print(f"ADD, REG[{operand_1}] <- REG[{operand_1}] + REG[{operand_2}]")
-            case 6: # ADD, сложение операнда с определённым числом
-                print(f"ADD, REG[{operand_1}] <- REG[{operand_1}] + {literal}")
-            case 7: # SUB, вычитание операндов
-                print(f"SUB, REG[{operand_1}] <- REG[{operand_1}] - REG[{operand_2}]")
-            case 8: # SUB, вычитание из операнда числа
-                print(f"SUB, REG[{operand_1}] <- REG[{operand_1}] - {literal}")
-            case 9: # CMP, сравнение, вычитание без записи (для флага) операнда
-                print(f"CMP, REG[{operand_1}] - REG[{operand_2}]")
-            case 10: # CMP, сравнение, вычитание без записи (для флага) числа
-                print(f"CMP, REG[{operand_1}] - {literal}")
-            case 11: # JS прыжок при SF = 1 (т.е. последнее арифметическое действие =< 0)
-                print(f"JS прыжок при SF = 1 в команду {literal}")
-            case 12: # JNS прыжок при SF = 0 (т.е. последнее арифметическое действие >= 0)
-                print(f"JNS прыжок при SF = 0 в команду {literal}")
-            case 13: # JNE прыжок при ZF = 0 (т.е. последнее арифметическое действие != 0)
-                print(f"JNE прыжок при ZF = 0 в команду {literal}")
-            case 14: # JG прыжок при SF = 0 и ZF = 0 (т.е. последнее арифметическое действие < 0)
-                print(f"MOV, REG[{operand_1}] <- DMEM[REG[{operand_2}]]")
-            case 15: # JE прыжок при ZF = 1 (т.е. последнее арифметическое действие = 0)
-                print(f"JE прыжок при ZF = 1 в команду {literal}")
-            case _:
-                raise ValueError("Неизвестная команда")
+        pass
+    
+    def connect_port(self, number:int, port) -> None:
+        """Подключение порта ввода-вывода
+
+        Parameters
+        ----------
+        `number` : int
+            Номер порта (от 0 до 15), по которому к нему обращаются команды `in` и `out`
+
+        `port` : InputPort | OutputPort
+            Порт из `utils.ports`
+        """
+        if not 0 <= number <= 15:
+            raise ValueError("Неверный номер порта", number)
+        self.ports[number] = port
+    
+    def flush_ports(self) -> None:
+        """Передача накопленных значений всех портов вывода получателям. Вызывается в конце `command_loop` и `run`"""
+        for port in self.ports.values():
+            if hasattr(port, "flush"):
+                port.flush()
     
     def clean_cmem(self) -> bool:
         """Сбрасывает все команды"""
         self.CMEM = []
+        self.decoded = None
+        self.verified = False
         return True
     
     def clean_reg(self) -> bool:
@@ -0,0 +1,170 @@
+from array import array
+from multiprocessing import shared_memory
+
+
+class SharedData():
+    """Данные для памяти данных, которые лежат в разделяемой памяти (`multiprocessing.shared_memory`) и не копируются между процессами
+
+    Создающий процесс передаёт значения, а рабочие процессы подключаются к тому же блоку по имени.
+    При передаче в другой процесс (`pickle`, аргументы `multiprocessing.Pool`) передаётся только имя блока, а не данные.
+    Сами данные только читаются, а записи процессора попадают в собственную копию изменений каждого `SharedMemoryView`
+
+    Значения хранятся как 64-битные целые числа со знаком, первое слово блока - количество значений
+
+    Parameters
+    ----------
+    `values` : list[int] = None
+        Значения для нового блока разделяемой памяти
+
+    `name` : str = None
+        Имя существующего блока, к которому нужно подключиться. Указывается вместо `values`
+
+    Attributes
+    ----------
+    `name` : str
+        Имя блока разделяемой памяти
+
+    `owner` : bool
+        Создан ли блок этим объектом. Только владелец удаляет блок в `unlink`
+
+    Methods
+    -------
+    `view`( : ) -> SharedMemoryView
+        Новая память данных для процессора над этими данными
+
+    `close`( : )
+        Отключение от блока в этом процессе
+
+    `unlink`( : )
+        Удаление блока (только у владельца)
+    """
+    def __init__(self, values:list[int] = None, name:str = None) -> None:
+        if (values is None) == (name is None):
+            raise ValueError("Нужно указать либо значения, либо имя блока разделяемой памяти", name)
+
+        if values is not None:
+            values = list(values)
+            self.shm = shared_memory.SharedMemory(create=True, size=8 * (len(values) + 1))
+            self.owner = True
+            words = self.shm.buf.cast("q")
+            words[0] = len(values)
+            try:
+                words[1:len(values) + 1] = memoryview(array("q", values)).cast("B").cast("q")
+            except (OverflowError, TypeError):
+                words.release()
+                self.shm.close()
+                self.shm.unlink()
+                raise ValueError("Значения разделяемой памяти должны быть 64-битными целыми числами")
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+            words = self.shm.buf.cast("q")
+
+        self.name = self.shm.name
+        self._words = words
+        self.values = words[1:words[0] + 1]
+
+    def view(self) -> "SharedMemoryView":
+        """Новая память данных для процессора над этими данными со своей (пустой) копией изменений"""
+        return SharedMemoryView(self)
+
+    def close(self) -> None:
+        """Отключение от блока в этом процессе. После этого созданные `view` использовать нельзя"""
+        if self.values is None:
+            return
+        self.values.release()
+        self._words.release()
+        self.values = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Удаление блока разделяемой памяти. Вызывается владельцем, когда все процессы закончили работу"""
+        self.close()
+        if self.owner:
+            self.shm.unlink()
+            self.owner = False
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __del__(self) -> None:
+        # Представления блока нужно освободить до того, как `SharedMemory` попробует закрыть его сам
+        if getattr(self, "values", None) is not None:
+            self.close()
+
+    def __reduce__(self):
+        return (SharedData, (None, self.name))
+
+    def __enter__(self) -> "SharedData":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.unlink()
+
+
+class SharedMemoryView():
+    """Память данных процессора над `SharedData`: чтение из разделяемой памяти, запись в собственную копию изменений
+
+    Ведёт себя как список: чтение и запись по индексу, `len`, перебор, сравнение со списком.
+    Разделяемые данные никогда не изменяются, поэтому любое количество процессоров (в том числе в разных процессах)
+    работает над одними данными, а память каждого растёт только на количество изменённых ячеек.
+    При передаче в другой процесс передаются только имя блока и изменённые ячейки
+
+    Parameters
+    ----------
+    `shared` : SharedData
+        Разделяемые данные
+
+    `changes` : dict[int, int] = None
+        Начальные изменённые ячейки
+
+    Attributes
+    ----------
+    `changes` : dict[int, int]
+        Изменённые ячейки: адрес -> значение
+
+    Methods
+    -------
+    `reset`( : )
+        Отмена всех изменений
+    """
+    def __init__(self, shared:SharedData, changes:dict = None) -> None:
+        self.shared = shared
+        self.values = shared.values
+        self.changes = {} if changes is None else dict(changes)
+
+    def __getitem__(self, address:int) -> int:
+        if address < 0:
+            address += len(self.values)
+        changes = self.changes
+        if address in changes:
+            return changes[address]
+        return self.values[address]
+
+    def __setitem__(self, address:int, value:int) -> None:
+        if address < 0:
+            address += len(self.values)
+        if not 0 <= address < len(self.values):
+            raise IndexError("Адрес вне памяти данных", address)
+        self.changes[address] = value
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        if not self.changes:
+            return iter(self.values)
+        return (self.changes.get(address, value) for address, value in enumerate(self.values))
+
+    def reset(self) -> None:
+        """Отмена всех изменений: память снова совпадает с разделяемыми данными"""
+        self.changes = {}
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __reduce__(self):
+        return (SharedMemoryView, (self.shared, self.changes))
+
+    def __repr__(self) -> str:
+        return repr(list(self))
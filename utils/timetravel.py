@@ -0,0 +1,318 @@
+from bisect import bisect_right
+
+from .isa import ISA, decode
+
+
+# Виды записей журнала изменений
+REGISTER = 0
+MEMORY = 1
+FLAGS = 2
+
+
+class _RecordingMemory():
+    """Память данных, которая записывает в журнал `TimeTravel` каждое изменение ячейки"""
+    def __init__(self, data, recorder:"TimeTravel") -> None:
+        self.data = data
+        self.recorder = recorder
+
+    def __getitem__(self, address:int) -> int:
+        return self.data[address]
+
+    def __setitem__(self, address:int, value:int) -> None:
+        old = self.data[address]
+        self.data[address] = value
+        if old != value:
+            self.recorder.log_change(MEMORY, address, old, value)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __repr__(self) -> str:
+        return repr(self.data)
+
+
+class TimeTravel():
+    """Класс для записи выполнения программы `ProcessorImitation` и перемещения по нему вперёд и назад
+
+    При записи ведётся журнал изменений: только изменившийся регистр, ячейка памяти данных или флаги.
+    Через каждые `interval` шагов сохраняется копия состояния: регистры, `pc`, флаги и ячейки памяти данных,
+    изменённые с предыдущей копии (старое и новое значение). Полная копия памяти данных не делается,
+    поэтому запись растёт с количеством изменений, а не с количеством шагов и размером памяти.
+
+    Перемещение к шагу выполняется без повторного выполнения команд. Память данных переносится изменениями из копий состояния
+    (целыми интервалами) и журнала (внутри интервала). Регистры и флаги восстанавливаются из ближайшей предыдущей копии и журнала,
+    а `pc` - проходом от неё по программе, в котором выполняются только команды прыжков: они зависят лишь от регистров и флагов.
+    Поэтому ввод из портов при перемещении не читается заново, а перемещение стоит не больше одного интервала шагов.
+
+    Parameters
+    ----------
+    `cpu` : ProcessorImitation
+        Процессор с загруженной программой
+
+    `interval` : int = 1024
+        Через сколько шагов сохраняется копия состояния
+
+    Attributes
+    ----------
+    `position` : int
+        Номер шага, состояние после которого сейчас находится в процессоре (0 - состояние до начала записи)
+
+    `steps` : int
+        Количество записанных шагов
+
+    `checkpoints` : list[tuple]
+        Копии состояния: (шаг, REG, pc, zf, sf, изменения памяти данных с предыдущей копии: адрес -> (старое, новое значение))
+
+    `log` : list[tuple]
+        Журнал изменений: (шаг, вид, номер, старое значение, новое значение)
+
+    Methods
+    -------
+    `record`(`max_steps` : int = None) -> int
+        Выполнение программы с записью, продолжая с текущего шага
+
+    `seek`(`step` : int) -> None
+        Перемещение к состоянию после шага `step`
+
+    `step_back`(`count` : int = 1) -> None
+        Перемещение на `count` шагов назад
+
+    `step_forward`(`count` : int = 1) -> None
+        Перемещение на `count` шагов вперёд
+
+    `memory_usage`( : ) -> dict[str, int]
+        Размер записи
+    """
+    def __init__(self, cpu, interval:int = 1024) -> None:
+        if interval <= 0:
+            raise ValueError("Интервал копий состояния должен быть положительным", interval)
+        self.cpu = cpu
+        self.interval = interval
+        self.position = 0
+        self.steps = 0
+        self.checkpoints = []
+        self.log = []
+        self._log_steps = []
+        self._changes = {}
+        self._program = None
+        self._jumps = None
+        self._step = 0
+
+    def log_change(self, kind:int, index, old, new) -> None:
+        """Добавление изменения текущего шага в журнал"""
+        self.log.append((self._step, kind, index, old, new))
+        self._log_steps.append(self._step)
+        if kind == MEMORY:
+            first = self._changes.get(index)
+            self._changes[index] = (old if first is None else first[0], new)
+
+    def checkpoint(self) -> None:
+        """Сохранение копии состояния для текущего шага вместе с изменениями памяти данных с предыдущей копии"""
+        cpu = self.cpu
+        self.checkpoints.append((self.position, list(cpu.REG), cpu.pc, cpu.zf, cpu.sf, self._changes))
+        self._changes = {}
+
+    def truncate(self) -> None:
+        """Удаление записи после текущего шага, чтобы продолжить выполнение с него"""
+        while self.checkpoints and self.checkpoints[-1][0] > self.position:
+            self.checkpoints.pop()
+        cut = bisect_right(self._log_steps, self.position)
+        del self.log[cut:]
+        del self._log_steps[cut:]
+        # Изменения памяти с последней копии до текущего шага
+        self._changes = {}
+        for _, kind, index, old, new in self.log[bisect_right(self._log_steps, self.checkpoints[-1][0]):]:
+            if kind == MEMORY:
+                first = self._changes.get(index)
+                self._changes[index] = (old if first is None else first[0], new)
+        self.steps = self.position
+
+    def record(self, max_steps:int = None) -> int:
+        """Выполнение программы с записью, продолжая с текущего шага
+
+        Если текущий шаг не последний записанный (после `seek`), запись после него удаляется.
+        Порты ввода при этом не возвращаются назад
+
+        Parameters
+        ----------
+        `max_steps` : int = None
+            Наибольшее количество шагов за этот вызов
+
+        Returns
+        -------
+        `steps` : int
+            Количество записанных шагов
+        """
+        cpu = self.cpu
+        if cpu.pc is None:
+            cpu.pc = 0
+        if self.position != self.steps:
+            self.truncate()
+        if not self.checkpoints:
+            self.checkpoint()
+
+        program = cpu.decoded if cpu.decoded is not None else cpu.predecode()
+        written = []
+        jumps = []
+        for word in cpu.CMEM:
+            opcode, literal, dest, op1, op2 = decode(word)
+            instruction = ISA.get(opcode)
+            fields = {"op1": op1, "op2": op2, "literal": literal, "dest": dest}
+            written.append(tuple({fields[field] for field in instruction.writes}) if instruction else ())
+            jumps.append(instruction is not None and instruction.is_jump)
+        self._program = program
+        self._jumps = jumps
+
+        N = len(program)
+        REG = cpu.REG
+        data = cpu.DMEM
+        cpu.DMEM = _RecordingMemory(data, self)
+        limit = -1 if max_steps is None else max_steps
+        done = 0
+        try:
+            while cpu.pc < N and done != limit:
+                pc = cpu.pc
+                execute, op1, op2, literal, dest = program[pc]
+                registers = written[pc]
+                old_registers = [REG[index] for index in registers]
+                old_flags = (cpu.zf, cpu.sf)
+                self._step = self.position + 1
+
+                execute(cpu, op1, op2, literal, dest)
+                cpu.pc += 1
+
+                for index, old in zip(registers, old_registers):
+                    if REG[index] != old:
+                        self.log_change(REGISTER, index, old, REG[index])
+                if (cpu.zf, cpu.sf) != old_flags:
+                    self.log_change(FLAGS, None, old_flags, (cpu.zf, cpu.sf))
+
+                self.position += 1
+                self.steps = self.position
+                done += 1
+                cpu.steps += 1
+                cpu.cycles += 1 # Остальные такты добавляют команды со стоимостью больше одного такта (см. `ProcessorImitation.predecode`)
+                if self.position % self.interval == 0:
+                    self.checkpoint()
+        finally:
+            cpu.DMEM = data
+        if cpu.pc >= N:
+            cpu.flush_ports()
+        return done
+
+    def apply(self, start:int, end:int, forward:bool, kind:int = None) -> None:
+        """Применение записей журнала для шагов из (start, end] вперёд или назад. `kind` - только записи этого вида"""
+        cpu = self.cpu
+        first = bisect_right(self._log_steps, start)
+        last = bisect_right(self._log_steps, end)
+        entries = self.log[first:last] if forward else reversed(self.log[first:last])
+        for _, entry_kind, index, old, new in entries:
+            if kind is not None and entry_kind != kind:
+                continue
+            value = new if forward else old
+            if entry_kind == REGISTER:
+                cpu.REG[index] = value
+            elif entry_kind == MEMORY:
+                cpu.DMEM[index] = value
+            else:
+                cpu.zf, cpu.sf = value
+
+    def checkpoint_index(self, step:int) -> int:
+        """Номер ближайшей копии состояния не позже шага `step`"""
+        return bisect_right(self.checkpoints, step, key=lambda item: item[0]) - 1
+
+    def move_memory(self, start:int, end:int) -> None:
+        """Перенос памяти данных из состояния после шага `start` в состояние после шага `end`
+
+        Внутри одного интервала применяется журнал, между интервалами - изменения из копий состояния,
+        поэтому переносится не больше изменённых ячеек, чем записано
+        """
+        a = self.checkpoint_index(start)
+        b = self.checkpoint_index(end)
+        if a == b:
+            self.apply(min(start, end), max(start, end), start < end, MEMORY)
+            return
+        memory = self.cpu.DMEM
+        self.apply(self.checkpoints[a][0], start, False, MEMORY)
+        if a < b:
+            for i in range(a + 1, b + 1):
+                for address, (_, new) in self.checkpoints[i][5].items():
+                    memory[address] = new
+        else:
+            for i in range(a, b, -1):
+                for address, (old, _) in self.checkpoints[i][5].items():
+                    memory[address] = old
+        self.apply(self.checkpoints[b][0], end, True, MEMORY)
+
+    def walk(self, start:int, end:int) -> None:
+        """Восстановление регистров, флагов и `pc` от состояния после шага `start` до шага `end` того же или следующих интервалов
+
+        На каждом шаге применяются записи журнала для регистров и флагов, а команды прыжков выполняются,
+        чтобы узнать следующий `pc`. Прыжки не обращаются к памяти данных и портам, а изменённый ими регистр совпадает с записью журнала
+        """
+        cpu = self.cpu
+        program = self._program
+        jumps = self._jumps
+        log = self.log
+        i = bisect_right(self._log_steps, start)
+        last = bisect_right(self._log_steps, end)
+        pc = cpu.pc
+        for step in range(start + 1, end + 1):
+            if jumps[pc]:
+                execute, op1, op2, literal, dest = program[pc]
+                cpu.pc = pc
+                execute(cpu, op1, op2, literal, dest)
+                following = cpu.pc + 1
+            else:
+                following = pc + 1
+            while i < last and log[i][0] == step:
+                _, kind, index, _, new = log[i]
+                if kind == REGISTER:
+                    cpu.REG[index] = new
+                elif kind == FLAGS:
+                    cpu.zf, cpu.sf = new
+                i += 1
+            pc = following
+        cpu.pc = pc
+
+    def seek(self, step:int) -> None:
+        """Перемещение к состоянию после шага `step`
+
+        Память данных переносится изменениями от текущего шага, регистры, флаги и `pc` восстанавливаются
+        от текущего шага (если перемещение вперёд в пределах интервала) или от ближайшей предыдущей копии состояния,
+        поэтому перемещение стоит не больше одного интервала шагов
+
+        Raises
+        ------
+        `ValueError`
+            Если шаг не записан
+        """
+        if not 0 <= step <= self.steps or not self.checkpoints:
+            raise ValueError("Шаг не записан", step, self.steps)
+        cpu = self.cpu
+        self.move_memory(self.position, step)
+        base, registers, pc, zf, sf, _ = self.checkpoints[self.checkpoint_index(step)]
+        if not base <= self.position <= step:
+            cpu.REG[:] = registers
+            cpu.pc = pc
+            cpu.zf, cpu.sf = zf, sf
+            self.position = base
+        self.walk(self.position, step)
+        cpu.steps = step
+        self.position = step
+
+    def step_back(self, count:int = 1) -> None:
+        """Перемещение на `count` шагов назад"""
+        self.seek(max(self.position - count, 0))
+
+    def step_forward(self, count:int = 1) -> None:
+        """Перемещение на `count` шагов вперёд (в пределах записанного)"""
+        self.seek(min(self.position + count, self.steps))
+
+    def memory_usage(self) -> dict:
+        """Размер записи: количество копий состояния, записей журнала и ячеек в изменениях памяти копий состояния"""
+        cells = sum(len(checkpoint[5]) for checkpoint in self.checkpoints) + len(self._changes)
+        return {"checkpoints": len(self.checkpoints), "log": len(self.log), "cells": cells}
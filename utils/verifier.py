@@ -0,0 +1,56 @@
+from .isa import ISA, decode
+
+
+def check_program(words:list[int], register_size:int, data_size:int) -> list[tuple]:
+    """Статическая проверка программы перед выполнением
+
+    Проверяется, что:
+    - каждая команда помещается в 32 бита и её код операции есть в таблице `utils.isa.ISA`;
+    - все поля с номерами регистров (операнды `r`, `[r]` и поля `reads`/`writes`) меньше `register_size`;
+    - прямые адреса памяти данных (операнды `d`, команды 2 и 3) меньше `data_size`;
+    - метки прыжков не выходят за программу. Прыжок на номер, равный длине программы, разрешён - это её конец.
+
+    Адреса косвенных обращений (`[r]`) зависят от значений регистров, поэтому статически не проверяются:
+    при выполнении они ведут себя так же, как в `ProcessorImitation.command` (адрес за концом памяти данных вызывает `IndexError`,
+    блочные команды проверяют свой диапазон сами)
+
+    Parameters
+    ----------
+    `words` : list[int]
+        Программа на машинном коде
+
+    `register_size` : int
+        Количество регистров
+
+    `data_size` : int
+        Размер памяти данных
+
+    Returns
+    -------
+    `problems` : list[tuple[int, str, int]]
+        Найденные ошибки: (номер команды, описание, значение). Пустой список, если программа корректна
+    """
+    problems = []
+    for pc, word in enumerate(words):
+        if type(word) is not int or not 0 <= word <= 0xFFFFFFFF:
+            problems.append((pc, "Команда не помещается в 32 бита", word))
+            continue
+        opcode, literal, dest, op1, op2 = decode(word)
+        instruction = ISA.get(opcode)
+        if instruction is None:
+            problems.append((pc, "Неизвестная команда", opcode))
+            continue
+
+        fields = {"op1": op1, "op2": op2, "literal": literal, "dest": dest}
+        registers = set(instruction.reads) | set(instruction.writes)
+        for kind, field in instruction.operands:
+            if kind in ("r", "[r]"):
+                registers.add(field)
+            elif kind == "d" and fields[field] >= data_size:
+                problems.append((pc, "Адрес вне памяти данных", fields[field]))
+            elif kind == "label" and fields[field] > len(words):
+                problems.append((pc, "Прыжок за пределы программы", fields[field]))
+        for field in sorted(registers):
+            if fields[field] >= register_size:
+                problems.append((pc, "Номер регистра вне памяти регистров", fields[field]))
+    return problems